@@ -1,58 +1,98 @@
 import streamlit as st
 from translate import translate_arabic_to_english
-from langdetect import detect, LangDetectException
-from check_similarity import translate_sentence_to_videos
-from moviepy.editor import VideoFileClip, concatenate_videoclips
+from check_similarity import translate_text_to_videos
+from examples import EXAMPLE_SENTENCES
+import metrics
 import os
+import render
+import render_queue
+import speech
 import speech_recognition as sr
+import warmup
+import wave
+
+# Speech engine for recognition: google (default), sphinx or whisper (offline)
+speech_engine = os.environ.get("ESL_SPEECH_ENGINE", "google")
+
+def speech_chunk_to_videos(text):
+    # Recognized speech can mix Arabic and English words; Arabic is matched directly where possible
+    return translate_text_to_videos(text, translate_arabic_to_english)
+
+def stream_speech_to_videos(frames, sample_rate, sample_width, language='ar-SA', energy_threshold=None):
+    """Recognize speech chunk by chunk, looking up the signs for each chunk while capture continues."""
+    recognizer = speech.get_recognizer(speech_engine, language)
+    video_sequence = []
+    recognized = False
 
-def recognize_speech_from_microphone(language='ar-SA'):
-    recognizer = sr.Recognizer()
-    
-    with sr.Microphone() as source:
-        st.info("Listening... Please speak something!")
-        audio = recognizer.listen(source)
-    
     try:
-        # Recognize speech using Google Speech Recognition
-        recognized_text = recognizer.recognize_google(audio, language=language)
-        st.success(f"You said: {recognized_text}")
-        return recognized_text
-    except sr.UnknownValueError:
-        st.error("Sorry, I could not understand the audio.")
-        return None
+        for text, videos in speech.transcribe_stream(frames, sample_rate, sample_width, recognizer,
+                                                     process=speech_chunk_to_videos,
+                                                     energy_threshold=energy_threshold):
+            if text:
+                recognized = True
+                st.success(f"You said: {text}")
+                video_sequence.extend(videos or [])
     except sr.RequestError as e:
-        st.error(f"Could not request results from Google Speech Recognition service; {e}")
-        return None
-    
-def concatenate_videos(video_sequence):
-    clips = []
-    
-    # Load each video file using moviepy
-    for video in video_sequence:
-        video_path = f"ESL_Processed/{video}.mp4"
-                
-        if os.path.exists(video_path):
-            clip = VideoFileClip(video_path)
-            clips.append(clip)
+        st.error(f"Could not request results from the speech recognition service; {e}")
+        return video_sequence
+
+    if not recognized:
+        st.error("Sorry, I could not understand the audio.")
+    return video_sequence
+
+def recognize_speech_from_microphone(language='ar-SA'):
+    with sr.Microphone(sample_rate=16000) as source:
+        st.info("Listening... Please speak something!")
+        return stream_speech_to_videos(speech.microphone_frames(source), source.SAMPLE_RATE, source.SAMPLE_WIDTH, language)
+
+def show_video_sequence(video_sequence):
+    if video_sequence:
+        combined_video_path = concatenate_videos(video_sequence)
+        if combined_video_path:
+            st.video(combined_video_path)
         else:
-            st.error(f"Could not generate due to lack of data.")
-    
-    if clips:
-        # Concatenate the clips
-        final_clip = concatenate_videoclips(clips)
-        
-        # Ensure the output directory exists
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)  # Create 'output' directory if it doesn't exist
-        
-        # Save the final concatenated video
-        output_path = os.path.join(output_dir, "combined_video.mp4")
-        final_clip.write_videofile(output_path, codec='libx264', audio=False)
-        
-        return output_path
+            st.error("Error concatenating videos.")
+            print("Error in combining videos")
     else:
+        st.error("Could not convert to sign language. Please try again!")
+    
+@st.cache_resource
+def get_render_queue():
+    # One render pool per server process, shared by every session
+    return render_queue.RenderQueue()
+
+def cancel_render_job():
+    """Cancel the render job left behind by this session's previous run, if any."""
+    job_id = st.session_state.pop('render_job', None)
+    if job_id:
+        get_render_queue().cancel(job_id)
+
+def concatenate_videos(video_sequence):
+    prerendered = render.find_prerendered(video_sequence)
+    if prerendered:
+        return prerendered
+
+    for video in render.missing_videos(video_sequence):
+        st.error(f"Could not generate due to lack of data.")
+
+    queue = get_render_queue()
+    cancel_render_job()
+    try:
+        job_id = queue.submit(video_sequence)
+    except render_queue.QueueFull:
+        st.warning("The renderer is busy right now. Please try again in a moment.")
         return None
+    st.session_state['render_job'] = job_id
+
+    # Updating the placeholder while polling lets a rerun interrupt the wait
+    progress = st.empty()
+    status = queue.wait(job_id, on_poll=lambda state: progress.info(f"Rendering video ({state})..."))
+    progress.empty()
+
+    st.session_state.pop('render_job', None)
+    if status == render_queue.FAILED and queue.error(job_id):
+        print(f"Render job {job_id} failed: {queue.error(job_id)}")
+    return queue.result(job_id)
 
 # UI configurations
 st.set_page_config(page_title="Emirati Sign Language Translator", 
@@ -198,7 +238,7 @@ def main_page():
 
         st.markdown("## How to Use the Translator App 🛠️")
         st.markdown(""" 
-                    - Select Language: Use the drop down to choose between English and Arabic.
+                    - Select Language: The language of typed text is detected automatically; for speech, use the drop down to choose between English and Arabic.
                     - Enter Text or Speech: Type text or use the microphone for speech input.
                     - Translation in ESL: The app converts the input to ESL gestures.""")
         
@@ -217,18 +257,15 @@ def main_page():
 
     elif selected_option == "Text to Sign Language":
         st.markdown("## Text to Sign Language Translation 🖋️➡️👐")
-        language = st.selectbox("Select Language", ["English", "Arabic"], key="text_language")
-        text_input = st.text_area("Enter your text here:")
+        text_input = st.text_area("Enter your text here (English, Arabic or a mix):")
         
         if st.button("Translate"):
             if text_input.strip(): 
                 
-                if language == 'Arabic':
-                    text_input = translate_arabic_to_english(text_input)
-
                 st.success(f"Translating...")
                 
-                video_sequence = translate_sentence_to_videos(text_input) 
+                # Arabic parts are matched directly in the Arabic-side index, with translation as a fallback
+                video_sequence = translate_text_to_videos(text_input, translate_arabic_to_english)
                 
                 if video_sequence:
                     combined_video_path = concatenate_videos(video_sequence)
@@ -249,83 +286,40 @@ def main_page():
 
 
         language_code = 'ar-SA' if language == 'Arabic' else 'en-US'
-        recognized_text = None
         
         if st.button("Start Speaking"):
-            recognized_text = recognize_speech_from_microphone(language=language_code)
-  
-            if recognized_text:
-                if language_code == 'ar-SA':
-                
-                    translated_text = translate_arabic_to_english(recognized_text)
-
-                    video_sequence = translate_sentence_to_videos(translated_text) 
-                    
-                    if video_sequence:
-                        combined_video_path = concatenate_videos(video_sequence)
-                        if combined_video_path:
-                            st.video(combined_video_path)
-                        else:
-                            st.error("Error concatenating videos.")
-                            print("Error in combining videos")
-                    else:
-                        st.error(f"Could not generate due to lack of data.")
-                else:
-                
-                    video_sequence = translate_sentence_to_videos(recognized_text) 
-                    
-                    if video_sequence:
-                        combined_video_path = concatenate_videos(video_sequence)
-                        if combined_video_path:
-                            st.video(combined_video_path)
-                        else:
-                            st.error("Error concatenating videos.")
-                            print("Error in combining videos")
-                    else:
-                        st.error("Could not convert to sign language. Please try again!")
-                        
+            # Signs are looked up for each chunk of speech as soon as it is recognized
+            video_sequence = recognize_speech_from_microphone(language=language_code)
+            show_video_sequence(video_sequence)
+
+        recording = st.file_uploader("Or upload a WAV recording", type=["wav"])
+        if recording is not None and st.button("Translate Recording"):
+            try:
+                frames, sample_rate, sample_width = speech.wav_frames(recording)
+            except (ValueError, EOFError, wave.Error) as e:
+                st.error(f"Could not read the recording; {e}")
             else:
-                st.error("Please try again.")
+                # The whole recording is available, so calibrate on all of it rather than its opening
+                video_sequence = stream_speech_to_videos(frames, sample_rate, sample_width, language=language_code,
+                                                         energy_threshold=speech.calibrate(frames))
+                show_video_sequence(video_sequence)
 
     elif selected_option == "Example Sentences":
         st.markdown("### Example Sentences for Testing")
         
         # Table of English and Arabic sentences
-        st.markdown("""
+        rows = "".join(f"""
+        <tr>
+            <td style="border: 1px solid #605678; padding: 10px;">{english}</td>
+            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">{arabic}</td>
+        </tr>""" for english, arabic in EXAMPLE_SENTENCES)
+        st.markdown(f"""
     <table style="width:100%; border-collapse: collapse; font-family: Arial, sans-serif;">
         <tr>
             <th style="border: 1px solid #605678; padding: 10px; background-color: #FFE6A5;">English</th>
             <th style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right; background-color: #FFE6A5;">العربية</th>
-        </tr>
-        <tr>
-            <td style="border: 1px solid #605678; padding: 10px;">Good Morning</td>
-            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">صباح الخير</td>
-        </tr>
-        <tr>
-            <td style="border: 1px solid #605678; padding: 10px;">Good Evening</td>
-            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">مساء الخير</td>
-        </tr>
-        <tr>
-            <td style="border: 1px solid #605678; padding: 10px;">How Are You?</td>
-            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">كيف حالك؟</td>
-        </tr>
-        <tr>
-            <td style="border: 1px solid #605678; padding: 10px;">Beautiful Sunrise</td>
-            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">شروق الشمس الجميل</td>
-        </tr>
-        <tr>
-            <td style="border: 1px solid #605678; padding: 10px;">The teacher gives the student a book.</td>
-            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">المعلم يعطي الطالب كتاباً.</td>
-        </tr>
-        <tr>
-            <td style="border: 1px solid #605678; padding: 10px;">The carpenter is building a house.</td>
-            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">النجار يبني منزلاً.</td>
-        </tr>
-        <tr>
-            <td style="border: 1px solid #605678; padding: 10px;">She is wearing a beautiful dress.</td>
-            <td style="border: 1px solid #605678; padding: 10px; direction: rtl; text-align: right;">هي ترتدي فستاناً جميلاً.</td>
-        </tr>
-        <!-- Add more rows as needed -->
+        </tr>{rows}
+        <!-- Add more rows in examples.py -->
     </table>
         """, unsafe_allow_html=True)
 
@@ -340,7 +334,7 @@ def main_page():
 
         st.markdown("## How to Use the Translator App 🛠️")
         st.markdown(""" 
-                    - Select Language: Use the drop down to choose between English and Arabic.
+                    - Select Language: The language of typed text is detected automatically; for speech, use the drop down to choose between English and Arabic.
                     - Enter Text or Speech: Type text or use the microphone for speech input.
                     - Translation in ESL: The app converts the input to ESL gestures.""")
         
@@ -360,9 +354,20 @@ def main_page():
 
 
 
+# Warm models, caches and frequent sentences once per server process;
+# ESL_WARMUP_SENTENCES names a file of sentences to pre-render instead of the examples
+warmup.start_background_warm_up(os.environ.get("ESL_WARMUP_SENTENCES"))
+
+# Serve /metrics and the /ready check for the load balancer when ESL_METRICS_PORT is set
+if os.environ.get("ESL_METRICS_PORT"):
+    metrics.start_metrics_server()
+
 if 'current_option' not in st.session_state:
     st.session_state['current_option'] = None
 
+# A render still pending from an interrupted run is no longer wanted
+cancel_render_job()
+
 # Run the app
 configure_sidebar()
 main_page()
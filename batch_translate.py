@@ -0,0 +1,170 @@
+"""Translate a whole text or CSV file of sentences to ESL videos.
+
+Identical and normalized-identical sentences are translated once, every
+unique word is resolved against the embedding index in one batch, and the
+unique video sequences are rendered on a pool of worker processes. A JSON
+Lines manifest maps each input line to its video and match details.
+
+    python batch_translate.py captions.txt --output-dir batch_output --workers 4
+    python batch_translate.py captions.csv --column text
+
+Arabic sentences (or Arabic parts of mixed sentences) are detected and
+translated to English first; --language English skips translation entirely.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import render_queue
+from language_detect import to_english
+from render import sequence_path
+
+# check_similarity loads the models on import, so it is imported inside the functions
+# that need it: spawned render workers re-import this module and must stay light.
+
+
+def read_sentences(path, column=None):
+    """Read one sentence per line (.txt) or per row (.csv, first column unless column is given)."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if not path.lower().endswith(".csv"):
+            return [line.rstrip("\r\n") for line in f]
+        if column:
+            return [row.get(column) or "" for row in csv.DictReader(f)]
+        return [row[0] if row else "" for row in csv.reader(f)]
+
+
+def normalize(sentence):
+    """Key used to deduplicate sentences: preprocessed text with collapsed whitespace."""
+    from check_similarity import preprocess_text
+    return re.sub(r'\s+', ' ', preprocess_text(sentence)).strip()
+
+
+def translate_arabic(text):
+    # Imported on first use so English-only files never load the MT model
+    from translate import translate_arabic_to_english
+    return translate_arabic_to_english(text)
+
+
+def translate_batch(sentences, similarity_threshold=0.8, translate=None):
+    """Translate sentences to video sequences, doing the work once per unique sentence and word.
+
+    translate, if given, maps each unique raw sentence to English first (e.g. Arabic MT).
+    Returns one record per input sentence.
+    """
+    from check_similarity import split_phrases, find_most_similar_videos_for_words
+
+    unique_raw = list(dict.fromkeys(s for s in sentences if s.strip()))
+    english = {s: translate(s) for s in unique_raw} if translate else {s: s for s in unique_raw}
+
+    normalized = {s: normalize(english[s]) for s in unique_raw}
+    parsed = {}
+    for key in dict.fromkeys(normalized.values()):
+        parsed[key] = split_phrases(key)
+
+    all_words = [w for _, words in parsed.values() for w in words]
+    resolved = find_most_similar_videos_for_words(all_words, similarity_threshold)
+
+    records = []
+    for line_number, sentence in enumerate(sentences, start=1):
+        record = {"line": line_number, "text": sentence, "normalized": None, "sequence": [],
+                  "matches": [], "unmatched": [], "video": None}
+        if sentence.strip():
+            key = normalized[sentence]
+            phrase_videos, words = parsed[key]
+            record["normalized"] = key
+            if translate:
+                record["english"] = english[sentence]
+            record["sequence"] = list(phrase_videos)
+            record["matches"] = [{"phrase_video": video} for video in phrase_videos]
+            for word in words:
+                video, similarity = resolved[word]
+                record["matches"].append({"word": word, "video": video, "similarity": round(float(similarity), 4)})
+                if video:
+                    record["sequence"].append(video)
+                else:
+                    record["unmatched"].append(word)
+        records.append(record)
+    return records
+
+
+def render_batch(records, output_dir, video_folder, workers):
+    """Render each unique video sequence once on a process pool and fill in record['video']."""
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = {}
+    for record in records:
+        if record["sequence"]:
+            jobs.setdefault(tuple(record["sequence"]), sequence_path(record["sequence"], output_dir))
+
+    unique = len(jobs)
+    rendered = {}
+    for seq, path in list(jobs.items()):
+        # concatenate_videos only moves complete videos into place, so an existing file is safe to reuse
+        if os.path.exists(path):
+            rendered[seq] = path
+            del jobs[seq]
+
+    # Spawned, not forked: the parent has the models and GPT threads loaded, and the
+    # workers only need the renderer (the same setup as render_queue.RenderQueue)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(render_queue._render, list(seq), path, video_folder): seq
+                   for seq, path in jobs.items()}
+        for future in as_completed(futures):
+            seq = futures[future]
+            try:
+                rendered[seq] = future.result()[0]
+            except Exception as e:
+                print(f"Rendering failed for {list(seq)}: {e}")
+                rendered[seq] = None
+
+    for record in records:
+        if record["sequence"]:
+            record["video"] = rendered.get(tuple(record["sequence"]))
+    return unique
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Text file (one sentence per line) or CSV file")
+    parser.add_argument("--column", help="CSV column holding the sentences (default: first column)")
+    parser.add_argument("--language", choices=["auto", "English", "Arabic"], default="auto")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument("--manifest", help="Manifest path (default: <output-dir>/manifest.jsonl)")
+    parser.add_argument("--video-folder", default="ESL_Processed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Render processes")
+    parser.add_argument("--similarity-threshold", type=float, default=0.8)
+    parser.add_argument("--no-render", action="store_true", help="Only write the manifest")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sentences = read_sentences(args.input, args.column)
+
+    translate = None
+    if args.language == "Arabic":
+        translate = translate_arabic
+    elif args.language == "auto":
+        translate = lambda sentence: to_english(sentence, translate_arabic)
+
+    records = translate_batch(sentences, args.similarity_threshold, translate)
+    unique_sentences = len({r["normalized"] for r in records if r["normalized"]})
+    print(f"{len(sentences)} lines, {unique_sentences} unique sentences "
+          f"({time.perf_counter() - start:.1f}s to resolve).")
+
+    if not args.no_render:
+        rendered = render_batch(records, args.output_dir, args.video_folder, args.workers)
+        print(f"Rendered {rendered} unique videos ({time.perf_counter() - start:.1f}s total).")
+
+    manifest = args.manifest or os.path.join(args.output_dir, "manifest.jsonl")
+    os.makedirs(os.path.dirname(manifest) or ".", exist_ok=True)
+    with open(manifest, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"Manifest saved to '{manifest}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Offline stand-ins for external services, used by the benchmark and load-test tools."""
+import hashlib
+import os
+import random
+import time
+from types import SimpleNamespace
+
+
+class StubServiceError(RuntimeError):
+    """Failure injected by StubChatClient."""
+
+
+class StubChatClient:
+    """Mimics client.chat.completions.create for the GPT-4 similarity check.
+
+    Answers 'yes' or 'no' deterministically from a hash of the prompt, after
+    sleeping for `latency` seconds (plus up to `jitter` seconds). To exercise
+    timeouts and the circuit breaker, a fraction `slow_rate` of calls take
+    `slow_latency` seconds instead and a fraction `error_rate` raise
+    StubServiceError.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, yes_ratio=0.5, seed=0,
+                 error_rate=0.0, slow_rate=0.0, slow_latency=10.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.yes_ratio = yes_ratio
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model=None, messages=None, **kwargs):
+        self.calls += 1
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            delay = self.slow_latency
+        else:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            raise StubServiceError("injected stub failure")
+
+        prompt = messages[-1]["content"] if messages else ""
+        digest = hashlib.sha1(prompt.encode("utf-8")).digest()
+        answer = "yes" if digest[0] / 255.0 < self.yes_ratio else "no"
+        message = SimpleNamespace(content=answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def add_stub_arguments(parser, gpt_latency=0.0, gpt_jitter=0.0):
+    """Add the options shared by the benchmark tools: the sentence cache and the stub GPT client."""
+    parser.add_argument("--sentence-cache", action="store_true",
+                        help="Keep the sentence result cache on (off by default, so repeated sentences measure the pipeline)")
+    parser.add_argument("--gpt-latency", type=float, default=gpt_latency, help="Stub GPT latency in seconds")
+    parser.add_argument("--gpt-jitter", type=float, default=gpt_jitter)
+    parser.add_argument("--gpt-error-rate", type=float, default=0.0, help="Fraction of stub GPT calls that fail")
+    parser.add_argument("--gpt-slow-rate", type=float, default=0.0,
+                        help="Fraction of stub GPT calls that take --gpt-slow-latency seconds")
+    parser.add_argument("--gpt-slow-latency", type=float, default=10.0)
+
+
+def install_stubs(args, seed=0):
+    """Point check_similarity at a StubChatClient built from the add_stub_arguments options.
+
+    Unless --sentence-cache was given the sentence cache is disabled, since a
+    small corpus would otherwise be answered from it after one pass.
+    Returns the stub so callers can report its call and error counts.
+    """
+    import check_similarity
+    from result_cache import SentenceCache
+
+    stub = StubChatClient(latency=args.gpt_latency, jitter=args.gpt_jitter, seed=seed,
+                          error_rate=args.gpt_error_rate, slow_rate=args.gpt_slow_rate,
+                          slow_latency=args.gpt_slow_latency)
+    check_similarity.set_client(stub)
+    if not args.sentence_cache:
+        check_similarity.set_sentence_cache(SentenceCache(maxsize=0))
+    return stub
+
+
+def make_synthetic_clips(names, folder, duration=1.0, size=(320, 240), fps=24):
+    """Write a short solid-colour mp4 per name into folder, skipping existing files."""
+    from moviepy.editor import ColorClip
+
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        path = os.path.join(folder, f"{name}.mp4")
+        if os.path.exists(path):
+            continue
+        digest = hashlib.sha1(name.encode("utf-8")).digest()
+        clip = ColorClip(size=size, color=(digest[0], digest[1], digest[2]), duration=duration)
+        clip.write_videofile(path, fps=fps, codec='libx264', audio=False, logger=None)
+        clip.close()
+    return folder
@@ -0,0 +1,105 @@
+"""Compare direct Arabic-side matching with the translate-then-match path.
+
+For each Arabic sentence, times MarianMT + translate_sentence_to_videos
+against translate_arabic_sentence_to_videos (multilingual index, MT only as
+a fallback) and reports how often the two produce the same video sequence.
+Needs video_embeddings_ar.json (python videoembeddings.py --multilingual).
+GPT-4 is replaced by a local stub.
+
+    python benchmark_arabic.py --sentences arabic.txt --output bench_arabic.json
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from bench_stubs import add_stub_arguments, install_stubs
+from check_similarity import get_arabic_index, translate_arabic_sentence_to_videos, translate_sentence_to_videos
+from examples import EXAMPLE_SENTENCES
+from translate import translate_arabic_to_english
+
+
+def summary_ms(samples):
+    values = np.asarray(samples) * 1000.0
+    return {
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+    }
+
+
+def overlap(a, b):
+    """Jaccard overlap of the videos in two sequences."""
+    if not a and not b:
+        return 1.0
+    return len(set(a) & set(b)) / len(set(a) | set(b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", help="Text file of Arabic sentences (default: the app's examples)")
+    parser.add_argument("--repeats", type=int, default=3)
+    add_stub_arguments(parser)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    if get_arabic_index() is None:
+        raise SystemExit("No Arabic-side index found; run 'python videoembeddings.py --multilingual' first.")
+    install_stubs(args)
+
+    if args.sentences:
+        with open(args.sentences, 'r', encoding='utf-8') as f:
+            sentences = [line.strip() for line in f if line.strip()]
+    else:
+        sentences = [arabic for _, arabic in EXAMPLE_SENTENCES]
+
+    mt_calls = 0
+
+    def counting_translate(text):
+        nonlocal mt_calls
+        mt_calls += 1
+        return translate_arabic_to_english(text)
+
+    # Exclude first-call overhead from both paths
+    translate_sentence_to_videos(translate_arabic_to_english(sentences[0]))
+    translate_arabic_sentence_to_videos(sentences[0], translate_arabic_to_english)
+
+    via_mt, direct, exact, overlaps = [], [], 0, []
+    for sentence in sentences:
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            mt_sequence = translate_sentence_to_videos(translate_arabic_to_english(sentence))
+            via_mt.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            direct_sequence = translate_arabic_sentence_to_videos(sentence, counting_translate)
+            direct.append(time.perf_counter() - start)
+
+        exact += mt_sequence == direct_sequence
+        overlaps.append(overlap(mt_sequence, direct_sequence))
+
+    results = {
+        "sentences": len(sentences),
+        "translate_then_match": summary_ms(via_mt),
+        "direct_arabic": summary_ms(direct),
+        "exact_sequence_agreement": exact / len(sentences),
+        "mean_video_overlap": float(np.mean(overlaps)),
+        "mt_calls_per_sentence_direct": mt_calls / (len(sentences) * args.repeats),
+    }
+
+    print(f"translate-then-match: p50 {results['translate_then_match']['p50_ms']:.1f} ms  "
+          f"p95 {results['translate_then_match']['p95_ms']:.1f} ms")
+    print(f"direct Arabic:        p50 {results['direct_arabic']['p50_ms']:.1f} ms  "
+          f"p95 {results['direct_arabic']['p95_ms']:.1f} ms  "
+          f"({results['mt_calls_per_sentence_direct']:.2f} MT calls/sentence)")
+    print(f"exact agreement {results['exact_sequence_agreement']:.2f}  "
+          f"video overlap {results['mean_video_overlap']:.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
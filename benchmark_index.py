@@ -0,0 +1,113 @@
+"""Compare float32, float16 and int8 storage of the sign embedding index.
+
+Reports memory footprint, per-lookup latency and top-1 agreement with the
+full-precision index. Uses video_embeddings_main.json when it exists,
+otherwise a synthetic dictionary of the requested size.
+
+    python benchmark_index.py --size 50000 --queries 500 --output index_bench.json
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+import numpy as np
+from sign_index import SignIndex, SUPPORTED_DTYPES
+
+
+def load_embeddings(path, size, dim, seed):
+    """Return (video_embeddings dict, bytes used by the json.load'ed dict)."""
+    if path and os.path.exists(path):
+        tracemalloc.start()
+        with open(path, 'r') as f:
+            video_embeddings = json.load(f)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return video_embeddings, dict_bytes
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((size, dim)).astype(np.float32)
+    tracemalloc.start()
+    video_embeddings = {
+        f"word_{i}": {"video_path": f"ESL_Processed/word_{i}.mp4", "embedding": vectors[i].tolist()}
+        for i in range(size)
+    }
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return video_embeddings, dict_bytes
+
+
+def make_queries(reference, count, noise, seed):
+    """Queries are stored embeddings plus noise, so each has a known near neighbour."""
+    rng = np.random.default_rng(seed + 1)
+    rows = rng.integers(0, len(reference), size=count)
+    base = reference.dequantize()[rows]
+    return base + noise * rng.standard_normal(base.shape).astype(np.float32)
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000.0)
+
+
+def run(args):
+    video_embeddings, dict_bytes = load_embeddings(args.embeddings, args.size, args.dim, args.seed)
+    reference = SignIndex.from_dict(video_embeddings, dtype="float32")
+    queries = make_queries(reference, args.queries, args.noise, args.seed)
+    reference_top1 = [reference.search(q)[0][0] for q in queries]
+
+    results = {
+        "entries": len(reference),
+        "dim": int(reference.matrix.shape[1]),
+        "json_dict_bytes": dict_bytes,
+        "dtypes": {},
+    }
+
+    for dtype in SUPPORTED_DTYPES:
+        index = SignIndex.from_dict(video_embeddings, dtype=dtype)
+        latencies = []
+        agree = 0
+        for query, expected in zip(queries, reference_top1):
+            start = time.perf_counter()
+            word = index.search(query)[0][0]
+            latencies.append(time.perf_counter() - start)
+            agree += word == expected
+
+        results["dtypes"][dtype] = {
+            "memory_bytes": index.memory_bytes(),
+            "p50_ms": percentile_ms(latencies, 50),
+            "p95_ms": percentile_ms(latencies, 95),
+            "mean_ms": float(np.mean(latencies) * 1000.0),
+            "top1_agreement": agree / len(queries),
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", default="video_embeddings_main.json")
+    parser.add_argument("--size", type=int, default=10000, help="Synthetic dictionary size when no JSON is found")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    print(f"Entries: {results['entries']}  dim: {results['dim']}  "
+          f"json dict: {results['json_dict_bytes'] / 1e6:.1f} MB")
+    for dtype, stats in results["dtypes"].items():
+        print(f"{dtype:>8}: {stats['memory_bytes'] / 1e6:8.2f} MB  "
+              f"p50 {stats['p50_ms']:.3f} ms  p95 {stats['p95_ms']:.3f} ms  "
+              f"top-1 agreement {stats['top1_agreement']:.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
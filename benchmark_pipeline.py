@@ -0,0 +1,204 @@
+"""End-to-end benchmark of the translation pipeline with stubbed external services.
+
+Runs each stage (preprocess, translate, embed, search, verify, render, plus the
+whole translate_sentence_to_videos call) on a fixed corpus: the app's example
+sentences and a seeded synthetic set. GPT-4 is replaced by a local stub and
+clips are synthetic, so no network or ESL_Processed folder is needed.
+
+    python benchmark_pipeline.py --synthetic 200 --output bench_pipeline.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import numpy as np
+
+import check_similarity
+from bench_stubs import add_stub_arguments, install_stubs, make_synthetic_clips
+from check_similarity import preprocess_text, check_semantic_similarity, translate_sentence_to_videos
+from embeddings import get_embeddings, get_embeddings_batch
+from examples import EXAMPLE_SENTENCES
+from render import concatenate_videos
+from sign_index import SignIndex
+
+ALL_STAGES = ("preprocess", "translate", "embed", "search", "verify", "render", "sentence")
+
+# Used when no embedding store is available, so the benchmark runs on a bare checkout
+SYNTHETIC_VOCABULARY = [
+    "good", "morning", "evening", "beautiful", "sunrise", "teacher", "give", "student",
+    "book", "carpenter", "build", "house", "wear", "dress", "hello", "thank", "you",
+    "family", "mother", "father", "brother", "sister", "friend", "school", "water",
+    "food", "eat", "drink", "sleep", "work", "car", "city", "desert", "sea", "sun",
+    "moon", "night", "day", "happy", "sad", "help", "please", "sorry", "yes", "no",
+    "big", "small", "hot", "cold", "doctor", "hospital", "market", "buy", "sell",
+]
+FILLER_WORDS = ["the", "a", "is", "are", "my", "to", "very", "and", "of", "in"]
+
+
+def percentiles(samples):
+    """Latency summary in milliseconds plus throughput in items per second."""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples) * 1000.0
+    total = float(np.sum(samples))
+    return {
+        "count": len(samples),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "throughput_per_s": len(samples) / total if total > 0 else None,
+    }
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def build_corpus(synthetic, vocabulary, seed):
+    """Example sentences followed by seeded random sentences from the vocabulary."""
+    rng = random.Random(seed)
+    sentences = [english for english, _ in EXAMPLE_SENTENCES]
+    for _ in range(synthetic):
+        length = rng.randint(2, 8)
+        words = [rng.choice(vocabulary) if rng.random() < 0.7 else rng.choice(FILLER_WORDS) for _ in range(length)]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+
+def setup_index(embeddings_path, clips_dir):
+    """Use the real embedding store when present, otherwise index the synthetic vocabulary."""
+    if embeddings_path and os.path.exists(embeddings_path):
+        index = SignIndex.load(embeddings_path, dtype=os.environ.get('ESL_INDEX_DTYPE'))
+        vocabulary = list(index.words)
+    else:
+        vocabulary = list(SYNTHETIC_VOCABULARY)
+        matrix = get_embeddings_batch(vocabulary)
+        paths = [os.path.join(clips_dir, f"{word}.mp4") for word in vocabulary]
+        index = SignIndex(vocabulary, paths, matrix, dtype=os.environ.get('ESL_INDEX_DTYPE', 'float32'))
+    check_similarity.set_video_index(index)
+    return index, vocabulary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    stages = args.stages.split(",") if args.stages else list(ALL_STAGES)
+    unknown = set(stages) - set(ALL_STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    stub = install_stubs(args, seed=args.seed)
+    index, vocabulary = setup_index(args.embeddings, args.clips_dir)
+    sentences = build_corpus(args.synthetic, vocabulary, args.seed)
+    processed = [preprocess_text(s) for s in sentences]
+    words = [w for p in processed for w in p.split()]
+
+    timings = {stage: [] for stage in stages}
+
+    if "preprocess" in timings:
+        for sentence in sentences:
+            timings["preprocess"].append(timed(preprocess_text, sentence)[1])
+
+    if "translate" in timings:
+        from translate import translate_arabic_to_english
+        arabic = [ar for _, ar in EXAMPLE_SENTENCES]
+        translate_arabic_to_english(arabic[0])  # Exclude first-call overhead
+        for _ in range(args.translate_repeats):
+            for sentence in arabic:
+                timings["translate"].append(timed(translate_arabic_to_english, sentence)[1])
+
+    embedded = []
+    if {"embed", "search", "verify", "render"} & set(timings):
+        get_embeddings(words[0])  # Exclude first-call overhead
+        for word in words:
+            embedding, elapsed = timed(get_embeddings, word)
+            embedded.append(embedding.cpu().numpy()[0])
+            if "embed" in timings:
+                timings["embed"].append(elapsed)
+
+    matches = []
+    for embedding in embedded:
+        result, elapsed = timed(index.search, embedding)
+        matches.append(result[0] if result else None)
+        if "search" in timings:
+            timings["search"].append(elapsed)
+
+    if "verify" in timings:
+        for word, match in zip(words, matches):
+            if match is not None:
+                timings["verify"].append(timed(check_semantic_similarity, word, match[0])[1])
+
+    if "render" in timings:
+        make_synthetic_clips(vocabulary, args.clips_dir)
+        output_path = os.path.join(args.clips_dir, "_render", "combined_video.mp4")
+        position = 0
+        for sentence_words in (p.split() for p in processed[:args.render_limit]):
+            sentence_matches = matches[position:position + len(sentence_words)]
+            position += len(sentence_words)
+            sequence = [os.path.splitext(os.path.basename(m[1]))[0] for m in sentence_matches if m]
+            if sequence:
+                timings["render"].append(timed(concatenate_videos, sequence, output_path,
+                                               video_folder=args.clips_dir, logger=None)[1])
+
+    if "sentence" in timings:
+        for sentence in sentences:
+            timings["sentence"].append(timed(translate_sentence_to_videos, sentence)[1])
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "corpus": {"sentences": len(sentences), "words": len(words), "index_entries": len(index)},
+        "gpt_calls": stub.calls,
+        "gpt_injected_errors": stub.errors,
+        "gpt_breaker_state": check_similarity.get_gpt_breaker().state,
+        "stages": {stage: percentiles(samples) for stage, samples in timings.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", default="video_embeddings_main.json")
+    parser.add_argument("--stages", help=f"Comma-separated subset of {','.join(ALL_STAGES)}")
+    parser.add_argument("--synthetic", type=int, default=100, help="Number of synthetic sentences")
+    parser.add_argument("--translate-repeats", type=int, default=3)
+    parser.add_argument("--render-limit", type=int, default=20, help="Sentences to render")
+    parser.add_argument("--clips-dir", default="bench_clips")
+    add_stub_arguments(parser)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"GPT stub: {results['gpt_calls']} calls, {results['gpt_injected_errors']} injected errors, "
+          f"breaker {results['gpt_breaker_state']}")
+
+    for stage, stats in results["stages"].items():
+        if stats["count"]:
+            print(f"{stage:>10}: n={stats['count']:<5} p50 {stats['p50_ms']:8.2f} ms  "
+                  f"p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+                  f"{stats['throughput_per_s']:.1f}/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,195 @@
-import json
-import numpy as np
-from embeddings import get_embeddings
-from sklearn.metrics.pairwise import cosine_similarity
+from embeddings import get_embeddings, get_embeddings_batch, multilingual_model_name
+from language_detect import split_segments
+from sign_index import SignIndex
+from gloss import GlossFilter
+from result_cache import SentenceCache, make_key
+from circuit_breaker import CircuitBreaker
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import verifier
+import metrics
 import re
 import os
-from env import client
+import json
+import time
+import threading
+import contextlib
 
 phrase_video_dict = {
     "how are you": "how_are_you"
     }
 
+# Best matches between this and the similarity threshold are checked with GPT-4
+VERIFY_THRESHOLD = 0.46
+
+
+# The video embedding index and the Azure OpenAI client are loaded on first use,
+# so benchmarks and tools can swap in their own with set_video_index / set_client.
+video_index = None
+gloss_filter = None
+arabic_index = None
+client = None
+sentence_cache = None
+local_verifier = None
+_verifier_disabled = False
+gpt_breaker = None
+
+# GPT-4 verdicts are appended here (JSON Lines) to train the local verifier; empty disables logging
+VERDICT_LOG = os.environ.get('ESL_VERDICT_LOG', 'gpt_verdicts.jsonl')
+# Only the real Azure OpenAI client's verdicts are logged; set_client turns this off
+log_verdicts = True
+
+# 'escalate' (default): local verifier first, GPT-4 only when it is unsure;
+# 'local': never call GPT-4 when a verifier is trained; 'gpt': always call GPT-4
+VERIFIER_MODE = os.environ.get('ESL_VERIFIER_MODE', 'escalate')
+_verdict_log_lock = threading.Lock()
+
+# Deadline for each GPT-4 check; calls still running after it are abandoned and count as failures
+GPT_TIMEOUT = float(os.environ.get('ESL_GPT_TIMEOUT', '3'))
+
+# Total time the GPT-4 checks of one translation may take; once it is spent the
+# remaining borderline words are decided in degraded mode
+GPT_BUDGET = float(os.environ.get('ESL_GPT_BUDGET', '6'))
+
+# While GPT-4 is unavailable (breaker open, error or timeout), borderline matches at or
+# above this similarity are accepted without verification
+DEGRADED_THRESHOLD = float(os.environ.get('ESL_DEGRADED_THRESHOLD', '0.55'))
+
+# GPT-4 calls run here so the caller can stop waiting at the deadline even if the client does not
+_gpt_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('ESL_GPT_CONCURRENCY', '8')),
+                                   thread_name_prefix='esl-gpt')
+
+# Marks the current thread's translation as degraded (e.g. a failed GPT-4 call) so it is not cached
+_request_state = threading.local()
+
+# Minimum similarity for an Arabic word to be matched directly in the Arabic-side index;
+# words below it go through machine translation instead
+ARABIC_SIMILARITY_THRESHOLD = float(os.environ.get('ESL_AR_SIMILARITY_THRESHOLD', '0.75'))
+
+# Longest run of Arabic words looked up as one gloss (e.g. "كيف حالك" for how_are_you) before single words
+ARABIC_MAX_NGRAM = 3
+
+
+def get_video_index():
+    """Return the video embedding index, loading it on first use.
+
+    ESL_INDEX_PATH selects the embedding store and ESL_INDEX_DTYPE its storage:
+    float32, float16 or int8 (default: as saved in a .npz store, float32 for JSON).
+    """
+    global video_index, gloss_filter
+    if video_index is None or video_index.is_stale():
+        # Also reloads after the embedding store is rebuilt, which changes the cache keys
+        try:
+            new_index = SignIndex.load(os.environ.get('ESL_INDEX_PATH', 'video_embeddings_main.json'),
+                                       dtype=os.environ.get('ESL_INDEX_DTYPE'))
+        except Exception as e:
+            # A store being rewritten by an older tool can be caught half-written; keep the old index
+            if video_index is None:
+                raise
+            print(f"Could not reload the video index, keeping the loaded one: {e}")
+            return video_index
+        video_index = new_index
+        gloss_filter = None
+    return video_index
+
+
+def set_video_index(index):
+    """Replace the video embedding index used for lookups."""
+    global video_index, gloss_filter
+    video_index = index
+    gloss_filter = None
+
+
+def get_sentence_cache():
+    """Return the sentence result cache, configured from the environment on first use."""
+    global sentence_cache
+    if sentence_cache is None:
+        sentence_cache = SentenceCache.from_env()
+    return sentence_cache
+
+
+def set_sentence_cache(cache):
+    """Replace the sentence result cache (SentenceCache(maxsize=0) disables it)."""
+    global sentence_cache
+    sentence_cache = cache
+
+
+def sentence_cache_key(processed_input, similarity_threshold):
+    """Cache key: normalized text plus everything else that decides the video sequence."""
+    index = get_video_index()
+    return make_key(" ".join(processed_input.split()), index.version, index.dtype,
+                    similarity_threshold, VERIFY_THRESHOLD, sorted(get_gloss_filter().skip_words),
+                    get_gloss_filter().enabled, phrase_video_dict, VERIFIER_MODE, verifier_version())
+
+
+def get_gloss_filter():
+    """Return the filter for non-signed words, built once from the index vocabulary."""
+    global gloss_filter
+    if gloss_filter is None:
+        gloss_filter = GlossFilter.from_env(get_video_index().words)
+    return gloss_filter
+
 
-# Load the video embeddings from the JSON file
-with open('video_embeddings_main.json', 'r') as f:
-    video_embeddings = json.load(f)
+def filter_gloss_words(words):
+    """Drop words ESL does not sign (articles, copulas, "to"), reporting the lookups saved."""
+    kept, skipped = get_gloss_filter().filter(words)
+    if skipped:
+        metrics.inc("esl_gloss_skipped_words_total", len(skipped))
+        print(f"Skipped {len(skipped)} non-signed word(s), saving {len(skipped)} lookup(s): {', '.join(skipped)}")
+    return kept
+
+
+def get_arabic_index():
+    """Return the Arabic-side index (multilingual embeddings), or None if it has not been built.
+
+    ESL_AR_INDEX_PATH selects the file (video_embeddings_ar.json by default).
+    """
+    global arabic_index
+    if arabic_index is None:
+        path = os.environ.get('ESL_AR_INDEX_PATH', 'video_embeddings_ar.json')
+        if not os.path.exists(path):
+            return None
+        arabic_index = SignIndex.load(path, dtype=os.environ.get('ESL_INDEX_DTYPE'))
+    return arabic_index
+
+
+def set_arabic_index(index):
+    """Replace the Arabic-side index used for direct Arabic lookups."""
+    global arabic_index
+    arabic_index = index
+
+
+def get_client():
+    """Return the Azure OpenAI client, importing it from env on first use."""
+    global client
+    if client is None:
+        from env import client as env_client
+        client = env_client
+    return client
+
+
+def set_client(new_client, log=False):
+    """Replace the chat client used for semantic similarity checks.
+
+    Its verdicts are only logged for verifier training when log is True, so
+    stub clients in benchmarks do not add made-up labels to the verdict log.
+    """
+    global client, log_verdicts
+    client = new_client
+    log_verdicts = log
+
+
+def get_gpt_breaker():
+    """Return the circuit breaker guarding GPT-4 calls, configured from the environment on first use."""
+    global gpt_breaker
+    if gpt_breaker is None:
+        gpt_breaker = CircuitBreaker.from_env("gpt")
+    return gpt_breaker
+
+
+def set_gpt_breaker(breaker):
+    """Replace the circuit breaker guarding GPT-4 calls."""
+    global gpt_breaker
+    gpt_breaker = breaker
 
 def preprocess_text(text):
     """Preprocess text by converting it to lowercase and removing punctuation."""
@@ -21,54 +197,162 @@ def preprocess_text(text):
     text = re.sub(r'[^\w\s]', '', text)  
     return text
 
-def check_semantic_similarity(word1, word2):
-    """Check if two words are semantically similar using Azure OpenAI."""
+@contextlib.contextmanager
+def gpt_budget(seconds=None):
+    """Share one time budget (GPT_BUDGET by default) between the GPT-4 checks made in this block.
+
+    Also usable as a decorator; nested blocks on the same thread share the
+    outermost budget, so a whole translation is bounded, not each segment.
+    """
+    if getattr(_request_state, "gpt_deadline", None) is not None:
+        yield
+        return
+    _request_state.gpt_deadline = time.monotonic() + (GPT_BUDGET if seconds is None else seconds)
+    try:
+        yield
+    finally:
+        _request_state.gpt_deadline = None
+
+
+def gpt_time_left():
+    """Seconds left in the current translation's GPT-4 budget, or None outside gpt_budget()."""
+    deadline = getattr(_request_state, "gpt_deadline", None)
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_semantic_similarity(word1, word2, similarity=None):
+    """Check if two words are semantically similar using Azure OpenAI.
+
+    Each call waits at most GPT_TIMEOUT, or what is left of the translation's
+    gpt_budget(), and goes through the circuit breaker. When GPT-4 fails,
+    times out, the budget is spent or the breaker is open, the verdict falls
+    back to degraded_verdict(similarity).
+    """
+    timeout = GPT_TIMEOUT
+    time_left = gpt_time_left()
+    if time_left is not None:
+        if time_left <= 0:
+            metrics.inc("esl_gpt_budget_exhausted_total")
+            return degraded_verdict(similarity)
+        timeout = min(timeout, time_left)
+
+    breaker = get_gpt_breaker()
+    if not breaker.allow():
+        metrics.inc("esl_gpt_short_circuits_total")
+        return degraded_verdict(similarity)
+
+    start = time.perf_counter()
     try:
-        print("1")
         messages = [
             {"role": "system", "content": f"Are the words '{word1}' and '{word2}' semantically similar or interchangeable in context? Respond with 'yes' if they are similar or interchangeable, and 'no' if they are not."}
         ] 
-        print("2")
-        response = client.chat.completions.create(
-            model='gpt-4',
-            messages=messages,
-            temperature=0.5,
-            # max_tokens=150,
-        )
-        print("3")
+        metrics.inc("esl_gpt_calls_total")
+        with metrics.span("gpt_verify"):
+            future = _gpt_executor.submit(
+                get_client().chat.completions.create,
+                model='gpt-4',
+                messages=messages,
+                temperature=0.5,
+                timeout=timeout,
+                # max_tokens=150,
+            )
+            try:
+                response = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise TimeoutError(f"no response within {timeout:.2f}s")
         answer = response.choices[0].message.content.strip()
-        print("4")
-        print(answer)
-        return answer.lower() == "yes"
     except Exception as e:
+        if isinstance(e, TimeoutError) and timeout < GPT_TIMEOUT:
+            # Cut short by the translation's budget, not a sign the service is unhealthy
+            breaker.release()
+        else:
+            breaker.record_failure()
+        metrics.inc("esl_gpt_errors_total", reason="timeout" if isinstance(e, TimeoutError) else "error")
         print(f"Error with Azure OpenAI API: {e}")
+        return degraded_verdict(similarity)
 
+    breaker.record_success(time.perf_counter() - start)
+    verdict = answer.lower() == "yes"
+    log_verdict(word1, word2, verdict)
+    return verdict
 
-def find_most_similar_video_for_word(word, similarity_threshold=0.6):
 
-    word_embedding = get_embeddings(word)
-    word_embedding_list = word_embedding.cpu().numpy().reshape(1, -1)  # Convert to 2D array for similarity calculation
+def degraded_verdict(similarity):
+    """Decide a borderline match by similarity alone, marking the translation degraded so it is not cached."""
+    _request_state.degraded = True
+    verdict = similarity is not None and similarity >= DEGRADED_THRESHOLD
+    metrics.inc("esl_degraded_verdicts_total", verdict="yes" if verdict else "no")
+    return verdict
 
-    max_similarity = -1  # Start with a very low similarity score
-    best_match_video = None
-    best_match_word = None
 
-    # Iterate over the video embeddings
-    for key_word, data in video_embeddings.items():
-        video_embedding = np.array(data['embedding']).reshape(1, -1)  # Convert embedding to 2D array
+def log_verdict(word1, word2, verdict):
+    """Append a GPT-4 verdict to the verdict log used to train the local verifier."""
+    if not VERDICT_LOG or not log_verdicts:
+        return
+    record = json.dumps({"word1": word1, "word2": word2, "verdict": verdict, "time": time.time()}, ensure_ascii=False)
+    try:
+        with _verdict_log_lock, open(VERDICT_LOG, 'a', encoding='utf-8') as f:
+            f.write(record + "\n")
+    except OSError as e:
+        print(f"Could not log verdict: {e}")
 
-        # Calculate cosine similarity
-        similarity = cosine_similarity(word_embedding_list, video_embedding)[0][0]
 
-        # Keep track of the best match
-        if similarity > max_similarity:
-            max_similarity = similarity
-            best_match_video = os.path.splitext(os.path.basename(data['video_path']))[0]
-            best_match_word = key_word
+def get_local_verifier():
+    """Return the trained local verifier (ESL_VERIFIER_PATH), or None."""
+    global local_verifier
+    if VERIFIER_MODE == 'gpt' or _verifier_disabled:
+        return None
+    if local_verifier is None or (local_verifier and local_verifier.is_stale()) \
+            or (local_verifier is False and os.path.exists(verifier.verifier_path())):
+        # Also reloads after verifier.pkl is trained or retrained, which changes the cache keys
+        local_verifier = verifier.load_from_env() or False
+    return local_verifier or None
 
-    # Check similarity conditions
-    if max_similarity < similarity_threshold and max_similarity >= 0.46:
-        if check_semantic_similarity(word, best_match_word):
+
+def verifier_version():
+    """Identifies the local verifier deciding borderline matches (None without one), for cache keys."""
+    local = get_local_verifier()
+    return local.version if local is not None else None
+
+
+def set_local_verifier(new_verifier):
+    """Replace the local verifier (None disables it)."""
+    global local_verifier, _verifier_disabled
+    local_verifier = new_verifier if new_verifier is not None else False
+    _verifier_disabled = new_verifier is None
+
+
+def verify_match(word1, word2, similarity=None):
+    """Decide a borderline match locally when confident, escalating to GPT-4 otherwise."""
+    local = get_local_verifier()
+    if local is not None:
+        with metrics.span("local_verify"):
+            verdict = local.decide(word1, word2)
+        if verdict is not None:
+            metrics.inc("esl_local_verdicts_total", verdict="yes" if verdict else "no")
+            return verdict
+        if VERIFIER_MODE == 'local':
+            metrics.inc("esl_local_verdicts_total", verdict="unsure")
+            return False
+        metrics.inc("esl_verifier_escalations_total")
+    return check_semantic_similarity(word1, word2, similarity)
+
+
+def similarity_band(similarity, similarity_threshold):
+    """Name the band a best-match similarity falls in, for metrics."""
+    if similarity >= similarity_threshold:
+        return "accept"
+    if similarity >= VERIFY_THRESHOLD:
+        return "verify"
+    return "reject"
+
+
+def accept_match(word, best_match_word, best_match_video, max_similarity, similarity_threshold):
+    """Apply the similarity thresholds (and local/GPT-4 check) to a best match, returning (video or None, similarity)."""
+    metrics.inc("esl_similarity_band_total", band=similarity_band(max_similarity, similarity_threshold))
+    if max_similarity < similarity_threshold and max_similarity >= VERIFY_THRESHOLD:
+        if verify_match(word, best_match_word, max_similarity):
             return best_match_video, max_similarity  
         else:
             return None, max_similarity  
@@ -78,20 +362,91 @@ def find_most_similar_video_for_word(word, similarity_threshold=0.6):
     return None, max_similarity  # Exclude if similarity is below 0.4
 
 
-def translate_sentence_to_videos(user_input, similarity_threshold=0.8):
-    processed_input = preprocess_text(user_input)
+def find_most_similar_video_for_word(word, similarity_threshold=0.6):
 
-    video_sequence = []
+    with metrics.span("embedding"):
+        word_embedding = get_embeddings(word).cpu().numpy()[0]
 
-    # First, check for common phrases
+    with metrics.span("index_search"):
+        matches = get_video_index().search(word_embedding, top_k=1)
+    if not matches:
+        return None, -1
+
+    # Best match over all video embeddings (cosine similarity)
+    best_match_word, best_match_path, max_similarity = matches[0]
+    best_match_video = os.path.splitext(os.path.basename(best_match_path))[0]
+
+    return accept_match(word, best_match_word, best_match_video, max_similarity, similarity_threshold)
+
+
+def find_most_similar_videos_for_words(words, similarity_threshold=0.6):
+    """Resolve many words at once, embedding them in batches.
+
+    Returns {word: (video or None, similarity)} for each unique word.
+    """
+    unique_words = list(dict.fromkeys(w for w in words if w.strip()))
+    if not unique_words:
+        return {}
+
+    with metrics.span("embedding"):
+        word_embeddings = get_embeddings_batch(unique_words)
+
+    index = get_video_index()
+    results = {}
+    for word, word_embedding in zip(unique_words, word_embeddings):
+        with metrics.span("index_search"):
+            matches = index.search(word_embedding, top_k=1)
+        if not matches:
+            results[word] = (None, -1)
+            continue
+        best_match_word, best_match_path, max_similarity = matches[0]
+        best_match_video = os.path.splitext(os.path.basename(best_match_path))[0]
+        results[word] = accept_match(word, best_match_word, best_match_video, max_similarity, similarity_threshold)
+
+    return results
+
+
+def split_phrases(processed_input):
+    """Pull the common phrases out of preprocessed text, returning (phrase videos, remaining words)."""
+    phrase_videos = []
     for phrase, video in phrase_video_dict.items():
         if phrase in processed_input:
-            video_sequence.append(video)  # Add the video for the matched phrase
+            phrase_videos.append(video)  # Add the video for the matched phrase
             processed_input = processed_input.replace(phrase, '')  # Remove matched phrase from input
+            metrics.inc("esl_phrase_matches_total")
             print(f"Matched phrase '{phrase}' with video '{video}'")
-    
-    # After removing phrases, tokenize the remaining words
-    words = processed_input.split()
+
+    # After removing phrases, tokenize the remaining words and drop the ones ESL does not sign
+    return phrase_videos, filter_gloss_words(processed_input.split())
+
+
+@gpt_budget()
+def translate_sentence_to_videos(user_input, similarity_threshold=0.8):
+    processed_input = preprocess_text(user_input)
+
+    cache = get_sentence_cache()
+    cache_key = None
+    if cache.enabled:
+        cache_key = sentence_cache_key(processed_input, similarity_threshold)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            metrics.inc("esl_cache_hits_total", cache="sentence")
+            return list(cached)
+        metrics.inc("esl_cache_misses_total", cache="sentence")
+
+    video_sequence = _translate_processed_to_videos(processed_input, similarity_threshold)
+
+    if cache_key is not None and not getattr(_request_state, "degraded", False):
+        # Store a copy: the caller owns the returned list
+        cache.set(cache_key, list(video_sequence))
+    return video_sequence
+
+
+def _translate_processed_to_videos(processed_input, similarity_threshold):
+    _request_state.degraded = False
+
+    # First, check for common phrases
+    video_sequence, words = split_phrases(processed_input)
 
     # For each word in the sentence, find the most similar video
     for word in words:
@@ -102,9 +457,83 @@ def translate_sentence_to_videos(user_input, similarity_threshold=0.8):
                 video_sequence.append(best_video)  # Add the best matching video to the sequence
                 print(f"Video sequence for word '{word}':", video_sequence)
             else:
+                metrics.inc("esl_unmatched_words_total")
                 print(f"No suitable video found for the word '{word}' (similarity: {similarity:.2f})")
 
     return video_sequence
 
 
+@gpt_budget()
+def translate_arabic_sentence_to_videos(user_input, translate, similarity_threshold=0.8):
+    """Look up Arabic words directly in the Arabic-side index.
+
+    At each position the longest run of up to ARABIC_MAX_NGRAM words that
+    confidently matches a multi-word gloss wins, then single words are tried.
+    Runs of words without a confident match are translated with translate(text)
+    and resolved through the English path, so MT only runs for what the index
+    cannot answer. Without an Arabic-side index the whole input is translated.
+    """
+    index = get_arabic_index()
+    if index is None:
+        return translate_sentence_to_videos(translate(user_input), similarity_threshold)
+
+    words = preprocess_text(user_input).split()
+    if not words:
+        return []
 
+    # Every candidate n-gram is embedded in one batch
+    spans = [(start, n) for start in range(len(words))
+             for n in range(1, min(ARABIC_MAX_NGRAM, len(words) - start) + 1)]
+    with metrics.span("embedding"):
+        span_embeddings = get_embeddings_batch([" ".join(words[s:s + n]) for s, n in spans],
+                                               model_name=multilingual_model_name)
+    span_embeddings = dict(zip(spans, span_embeddings))
+
+    video_sequence = []
+    unmatched = []
+
+    def flush_unmatched():
+        # Translate the pending run of unmatched words as one phrase
+        if unmatched:
+            metrics.inc("esl_arabic_fallbacks_total")
+            video_sequence.extend(translate_sentence_to_videos(translate(" ".join(unmatched)), similarity_threshold))
+            unmatched.clear()
+
+    position = 0
+    while position < len(words):
+        match, length = None, 1
+        for n in range(min(ARABIC_MAX_NGRAM, len(words) - position), 0, -1):
+            with metrics.span("index_search"):
+                matches = index.search(span_embeddings[(position, n)], top_k=1)
+            if not matches or matches[0][2] < ARABIC_SIMILARITY_THRESHOLD:
+                continue
+            # A run of words only counts when it matches a multi-word gloss, so "كتاب جديد" is not read as "book"
+            if n > 1 and len(re.split(r'[\s_]+', matches[0][0].strip())) < 2:
+                continue
+            match, length = matches[0], n
+            break
+
+        phrase = " ".join(words[position:position + length])
+        if match is not None:
+            flush_unmatched()
+            metrics.inc("esl_arabic_direct_matches_total")
+            video_sequence.append(os.path.splitext(os.path.basename(match[1]))[0])
+            print(f"Matched Arabic '{phrase}' with '{match[0]}' (similarity: {match[2]:.2f})")
+        else:
+            unmatched.append(phrase)
+        position += length
+    flush_unmatched()
+
+    return video_sequence
+
+
+@gpt_budget()
+def translate_text_to_videos(user_input, translate, similarity_threshold=0.8):
+    """Translate English, Arabic or mixed text, handling each language segment on its own path."""
+    video_sequence = []
+    for language, segment in split_segments(user_input):
+        if language == 'ar':
+            video_sequence.extend(translate_arabic_sentence_to_videos(segment, translate, similarity_threshold))
+        else:
+            video_sequence.extend(translate_sentence_to_videos(segment, similarity_threshold))
+    return video_sequence
@@ -0,0 +1,90 @@
+"""Circuit breaker for calls to a remote dependency (Azure OpenAI).
+
+The breaker opens after failure_threshold consecutive failures, where a call
+slower than slow_call_s counts as a failure even if it succeeds. While open,
+calls are refused so the caller can use its degraded path straight away.
+After reset_timeout_s one trial call is let through (half-open); it closes
+the breaker on success and re-opens it on failure.
+
+ESL_BREAKER_FAILURES, ESL_BREAKER_SLOW_CALL and ESL_BREAKER_RESET configure
+the breaker built by from_env().
+"""
+import os
+import threading
+import time
+
+import metrics
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker; thread-safe, with its state exported as a gauge."""
+
+    def __init__(self, name, failure_threshold=5, slow_call_s=5.0, reset_timeout_s=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_s = slow_call_s
+        self.reset_timeout_s = reset_timeout_s
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        metrics.set_gauge("esl_circuit_breaker_state", _STATE_VALUES[CLOSED], breaker=name)
+
+    @classmethod
+    def from_env(cls, name):
+        return cls(name,
+                   failure_threshold=int(os.environ.get("ESL_BREAKER_FAILURES", "5")),
+                   slow_call_s=float(os.environ.get("ESL_BREAKER_SLOW_CALL", "2.5")),
+                   reset_timeout_s=float(os.environ.get("ESL_BREAKER_RESET", "30")))
+
+    def allow(self):
+        """Whether a call may go out now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout_s:
+                    return False
+                self._transition(HALF_OPEN)
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self, duration):
+        """Report a completed call; slow calls count as failures."""
+        if duration >= self.slow_call_s:
+            self.record_failure()
+            return
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        """Report a failed or timed-out call."""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release(self):
+        """Report a call abandoned for reasons of the caller's own (e.g. its time budget ran out)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _transition(self, state):
+        print(f"Circuit breaker '{self.name}': {self.state} -> {state}")
+        self.state = state
+        metrics.set_gauge("esl_circuit_breaker_state", _STATE_VALUES[state], breaker=self.name)
+        metrics.inc("esl_circuit_breaker_transitions_total", breaker=self.name, state=state)
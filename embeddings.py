@@ -1,16 +1,72 @@
-from transformers import AutoTokenizer, AutoModel
-import torch
+import threading
+import numpy as np
 
-# Load pre-trained model and tokenizer
+# Pre-trained model for the sign index
 model_name = 'sentence-transformers/all-MiniLM-L6-v2'  # You can choose other models as well
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModel.from_pretrained(model_name)
+
+# Multilingual model used for the Arabic-side sign index (same 384-dim output)
+multilingual_model_name = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+
+# Models (and torch/transformers) are loaded on first use, so modules that import this one
+# can be imported without them; warmup.py loads them at startup
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_model(name=None):
+    """Return (tokenizer, model) for a model name, loading it on first use."""
+    if name is None:
+        name = model_name
+    with _models_lock:
+        if name not in _models:
+            from transformers import AutoTokenizer, AutoModel
+            _models[name] = (AutoTokenizer.from_pretrained(name), AutoModel.from_pretrained(name))
+        return _models[name]
+
+
+def mean_pooling(last_hidden_state, attention_mask):
+    """Average token embeddings, ignoring padding positions."""
+    mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+    summed = (last_hidden_state * mask).sum(dim=1)
+    counts = mask.sum(dim=1).clamp(min=1e-9)
+    return summed / counts
+
 
 # Function to get embeddings
-def get_embeddings(text):
+def get_embeddings(text, model_name=None):
+    import torch
+    tokenizer, model = load_model(model_name)
     inputs = tokenizer(text, return_tensors='pt', padding=True, truncation=True)
     with torch.no_grad():
         outputs = model(**inputs)
-    embeddings = outputs.last_hidden_state.mean(dim=1)  # Mean pooling
+    embeddings = mean_pooling(outputs.last_hidden_state, inputs['attention_mask'])  # Mean pooling
     return embeddings
 
+
+def get_embeddings_batch(texts, batch_size=64, model_name=None):
+    """Embed a list of texts and return a contiguous float32 matrix (one row per text).
+
+    Texts are sorted by token length and split into buckets so each padded
+    batch holds inputs of similar length. Rows come back in the input order.
+    """
+    import torch
+    tokenizer, model = load_model(model_name)
+    texts = list(texts)
+    hidden_size = model.config.hidden_size
+    if not texts:
+        return np.empty((0, hidden_size), dtype=np.float32)
+
+    # Sort by token length so padding inside each batch stays small
+    lengths = [len(ids) for ids in tokenizer(texts, truncation=True)['input_ids']]
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+    result = np.empty((len(texts), hidden_size), dtype=np.float32)
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        inputs = tokenizer([texts[i] for i in bucket], return_tensors='pt', padding=True, truncation=True)
+        with torch.no_grad():
+            outputs = model(**inputs)
+        pooled = mean_pooling(outputs.last_hidden_state, inputs['attention_mask'])
+        result[bucket] = pooled.cpu().numpy()
+
+    return np.ascontiguousarray(result)
@@ -0,0 +1,72 @@
+"""Offline evaluation of the local verifier against logged GPT-4 verdicts.
+
+Splits the verdict log into train and test pairs (or evaluates a saved model
+on the whole log) and, for each confidence level, reports how many GPT-4
+calls the verifier would avoid and how often its confident answers agree
+with GPT-4.
+
+    python evaluate_verifier.py --log gpt_verdicts.jsonl
+    python evaluate_verifier.py --log gpt_verdicts.jsonl --model verifier.pkl
+"""
+import argparse
+import json
+import random
+import numpy as np
+
+from verifier import LocalVerifier, load_verdicts
+
+CONFIDENCE_LEVELS = (0.6, 0.7, 0.8, 0.85, 0.9, 0.95)
+
+
+def evaluate(model, verdicts, confidence_levels=CONFIDENCE_LEVELS):
+    probabilities = model.probabilities(verdicts)
+    labels = np.array([verdict for _, _, verdict in verdicts], dtype=bool)
+    results = []
+    for confidence in confidence_levels:
+        confident = (probabilities >= confidence) | (probabilities <= 1.0 - confidence)
+        predictions = probabilities >= 0.5
+        correct = (predictions == labels) & confident
+        results.append({
+            "confidence": confidence,
+            "gpt_calls_avoided": float(confident.mean()),
+            "local_agreement": float(correct.sum() / confident.sum()) if confident.any() else None,
+            # Escalated pairs get GPT-4's own verdict, so they always agree
+            "overall_agreement": float((correct.sum() + (~confident).sum()) / len(labels)),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default="gpt_verdicts.jsonl")
+    parser.add_argument("--model", help="Evaluate this saved verifier on the whole log instead of a train/test split")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    verdicts = load_verdicts(args.log)
+    if args.model:
+        model = LocalVerifier.load(args.model)
+        test = verdicts
+    else:
+        random.Random(args.seed).shuffle(verdicts)
+        split = max(1, int(len(verdicts) * args.test_fraction))
+        test, train = verdicts[:split], verdicts[split:]
+        model = LocalVerifier.train(train)
+        print(f"Trained on {len(train)} pairs, testing on {len(test)}.")
+
+    results = evaluate(model, test)
+    for row in results:
+        local = f"{row['local_agreement']:.3f}" if row["local_agreement"] is not None else "  n/a"
+        print(f"confidence {row['confidence']:.2f}: avoids {row['gpt_calls_avoided']:6.1%} of GPT calls, "
+              f"local agreement {local}, overall agreement {row['overall_agreement']:.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"pairs": len(test), "levels": results}, f, indent=2)
+        print(f"Results saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+# Example sentences shown on the app's "Examples" page, as (English, Arabic) pairs.
+# Also used as the fixed corpus for benchmarks and warm-up.
+EXAMPLE_SENTENCES = [
+    ("Good Morning", "صباح الخير"),
+    ("Good Evening", "مساء الخير"),
+    ("How Are You?", "كيف حالك؟"),
+    ("Beautiful Sunrise", "شروق الشمس الجميل"),
+    ("The teacher gives the student a book.", "المعلم يعطي الطالب كتاباً."),
+    ("The carpenter is building a house.", "النجار يبني منزلاً."),
+    ("She is wearing a beautiful dress.", "هي ترتدي فستاناً جميلاً."),
+]
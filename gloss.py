@@ -0,0 +1,50 @@
+"""Gloss preprocessing: drop tokens that ESL does not sign before looking them up.
+
+Articles, copulas and the infinitive "to" are normally not signed, yet each
+one costs an embedding pass, an index scan and possibly a GPT-4 check. The
+have/do family is left alone since it is often a main verb ("has a book",
+"do homework"). The skip set is computed once per index from NON_SIGNED_WORDS
+minus the words the index has a video for, so a dictionary that does sign one
+of them keeps it.
+
+ESL_GLOSS_FILTER=0 disables filtering; ESL_GLOSS_SKIP and ESL_GLOSS_KEEP add
+comma-separated words to, or remove them from, the skip set.
+"""
+import os
+
+NON_SIGNED_WORDS = frozenset({
+    # Articles
+    "a", "an", "the",
+    # Copulas
+    "am", "is", "are", "was", "were", "be", "been", "being",
+    # Infinitive marker
+    "to",
+})
+
+
+def _env_words(name):
+    return {w.strip().lower() for w in os.environ.get(name, "").split(",") if w.strip()}
+
+
+class GlossFilter:
+    """Removes non-signed tokens from a word list, using a skip set precomputed from the vocabulary."""
+
+    def __init__(self, vocabulary=(), skip_words=NON_SIGNED_WORDS, keep_words=(), enabled=True):
+        vocabulary = {w.lower() for w in vocabulary}
+        self.enabled = enabled
+        self.skip_words = frozenset(set(skip_words) - vocabulary - set(keep_words))
+
+    @classmethod
+    def from_env(cls, vocabulary=()):
+        enabled = os.environ.get("ESL_GLOSS_FILTER", "1").lower() not in ("0", "false", "no")
+        skip_words = NON_SIGNED_WORDS | _env_words("ESL_GLOSS_SKIP")
+        return cls(vocabulary, skip_words, _env_words("ESL_GLOSS_KEEP"), enabled)
+
+    def filter(self, words):
+        """Split words into (kept, skipped), preserving order."""
+        if not self.enabled:
+            return list(words), []
+        kept, skipped = [], []
+        for word in words:
+            (skipped if word in self.skip_words else kept).append(word)
+        return kept, skipped
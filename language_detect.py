@@ -0,0 +1,55 @@
+"""Script-based language detection so only Arabic text goes through MarianMT.
+
+Each word is classified by the letters it contains: Arabic letters, Latin
+letters or, for a word with both, whichever is the majority. Words with no
+letters (digits, punctuation) join the neighbouring run. Mixed input is split
+into runs of Arabic and non-Arabic words so each run can be handled on its own.
+"""
+import re
+
+ARABIC_CHARS = re.compile('[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+LATIN_CHARS = re.compile('[A-Za-z\u00C0-\u024F]')
+
+
+def contains_arabic(text):
+    return ARABIC_CHARS.search(text) is not None
+
+
+def detect_language(text, default='en'):
+    """Return 'ar' or 'en' for text by the majority script of its letters, or default without letters."""
+    arabic = len(ARABIC_CHARS.findall(text))
+    latin = len(LATIN_CHARS.findall(text))
+    if not arabic and not latin:
+        return default
+    return 'ar' if arabic >= latin else 'en'
+
+
+def _token_script(token):
+    if not contains_arabic(token) and not LATIN_CHARS.search(token):
+        return None  # digits, punctuation: joins the surrounding segment
+    return detect_language(token)
+
+
+def split_segments(text, default='en'):
+    """Split text into [(language, segment)] runs of Arabic and non-Arabic words.
+
+    Text without any letters comes back as a single segment in the default language.
+    """
+    segments = []
+    for token in text.split():
+        script = _token_script(token)
+        if segments and (script is None or segments[-1][0] in (None, script)):
+            if segments[-1][0] is None:
+                segments[-1][0] = script
+            segments[-1][1].append(token)
+        else:
+            segments.append([script, [token]])
+    return [(script or default, " ".join(tokens)) for script, tokens in segments]
+
+
+def to_english(text, translate):
+    """Translate only the Arabic segments of text with translate(segment); other segments pass through."""
+    parts = []
+    for language, segment in split_segments(text):
+        parts.append(translate(segment) if language == 'ar' else segment)
+    return " ".join(part for part in parts if part)
@@ -0,0 +1,260 @@
+"""Concurrent load test of the translation pipeline with a stub GPT client.
+
+Simulated sessions arrive as a Poisson process at each offered rate and run
+translate_text_to_videos followed by a render through a RenderQueue, like a
+user pressing Translate in the app, so ESL_RENDER_WORKERS and
+ESL_RENDER_QUEUE_SIZE bound rendering the same way. Latency is measured from
+arrival, so it includes queueing. For each rate the tool reports throughput,
+p50/p95/p99 latency, renders rejected with QueueFull and CPU/RSS (including
+the render workers) over time; the saturation point is the first rate where
+fewer sessions complete than arrived, renders are rejected or p95 exceeds
+the SLO. A backlog that only drains after the last arrival shows up as queueing
+in the latency percentiles.
+
+    python load_test.py --rates 0.5,1,2,4 --duration 60 --sessions 8 --output load.json
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+import render_queue
+from bench_stubs import add_stub_arguments, install_stubs, make_synthetic_clips
+
+# The pipeline modules load the models on import, so they are imported inside the
+# functions: spawned render workers re-import this module and must stay as light
+# as the app's workers.
+
+
+def read_rss_bytes(pid="self"):
+    """Resident set size of a process (this one by default), from /proc when available."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if pid != "self":
+            return 0
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU utilisation (process, render workers and finished ffmpeg children) and RSS."""
+
+    def __init__(self, interval=1.0, queue=None):
+        super().__init__(name="esl-load-sampler", daemon=True)
+        self.interval = interval
+        self.queue = queue
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        last_wall = start
+        last_cpu = self._cpu_seconds()
+        while not self._stop_event.wait(self.interval):
+            wall = time.perf_counter()
+            cpu = self._cpu_seconds()
+            self.samples.append({
+                "t": round(wall - start, 3),
+                "cpu_percent": 100.0 * (cpu - last_cpu) / max(wall - last_wall, 1e-9),
+                "rss_mb": self._rss_bytes() / 1e6,
+            })
+            last_wall, last_cpu = wall, cpu
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def _rss_bytes(self):
+        return read_rss_bytes() + sum(read_rss_bytes(pid) for pid in self._worker_pids())
+
+    def _worker_pids(self):
+        return self.queue.worker_pids() if self.queue else ()
+
+    def _cpu_seconds(self):
+        times = os.times()
+        total = times.user + times.system + times.children_user + times.children_system
+        # Render workers are long-lived, so they never show up in children_* until they exit
+        for pid in self._worker_pids():
+            total += read_process_cpu_seconds(pid)
+        return total
+
+
+def read_process_cpu_seconds(pid):
+    """User plus system CPU time of a process, from /proc (0 when unavailable)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def run_session(sentence, queue):
+    """Translate a sentence and, when queue is given, render it; returns False if the render was rejected."""
+    from batch_translate import translate_arabic
+    from check_similarity import translate_text_to_videos
+
+    video_sequence = translate_text_to_videos(sentence, translate_arabic)
+    if queue is None or not video_sequence:
+        return True
+    try:
+        job_id = queue.submit(video_sequence)
+    except render_queue.QueueFull:
+        return False
+    if queue.wait(job_id, poll_interval=0.05) == render_queue.FAILED:
+        raise RuntimeError(f"render failed: {queue.error(job_id)}")
+    return True
+
+
+def run_rate(rate, args, sentences, rng, queue=None):
+    """Drive sessions at `rate` arrivals per second for args.duration seconds."""
+    import check_similarity
+
+    latencies = []
+    errors = 0
+    rejected = 0
+    lock = threading.Lock()
+
+    def session(session_id, arrival, sentence):
+        nonlocal errors, rejected
+        try:
+            accepted = run_session(sentence, queue)
+            with lock:
+                if accepted:
+                    latencies.append(time.perf_counter() - arrival)
+                else:
+                    rejected += 1
+        except Exception as e:
+            with lock:
+                errors += 1
+            print(f"Session {session_id} failed: {e}")
+
+    sampler = ResourceSampler(args.sample_interval, queue)
+    sampler.start()
+    start = time.perf_counter()
+    next_arrival = start
+    submitted = 0
+
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival - start > args.duration:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(session, submitted, next_arrival, rng.choice(sentences))
+            submitted += 1
+
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+
+    values = np.asarray(latencies) * 1000.0 if latencies else np.zeros(1)
+    return {
+        "offered_rate": rate,
+        "submitted": submitted,
+        "arrival_rate_per_s": submitted / args.duration,
+        "completed": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "gpt_breaker_state": check_similarity.get_gpt_breaker().state,
+        "max_cpu_percent": max((s["cpu_percent"] for s in sampler.samples), default=0.0),
+        "max_rss_mb": max((s["rss_mb"] for s in sampler.samples), default=read_rss_bytes() / 1e6),
+        "timeline": sampler.samples,
+    }
+
+
+def find_saturation(results, slo_ms):
+    """First offered rate the box could not keep up with, or None."""
+    for result in results:
+        # Compare with the sessions that actually arrived: Poisson arrivals vary around the offered rate
+        falling_behind = result["completed"] < 0.9 * result["submitted"]
+        if falling_behind or result["errors"] or result["rejected"] or result["p95_ms"] > slo_ms:
+            return result["offered_rate"]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default="0.5,1,2,4", help="Comma-separated arrival rates (sessions/s)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run each rate")
+    parser.add_argument("--sessions", type=int, default=8, help="Maximum concurrent sessions")
+    parser.add_argument("--slo", type=float, default=10000.0, help="p95 latency objective in ms")
+    parser.add_argument("--no-render", action="store_true", help="Skip the video render step")
+    parser.add_argument("--render-workers", type=int, help="Render worker processes (default: ESL_RENDER_WORKERS)")
+    parser.add_argument("--render-queue-size", type=int,
+                        help="Render jobs queued or running before QueueFull (default: ESL_RENDER_QUEUE_SIZE)")
+    parser.add_argument("--embeddings", default="video_embeddings_main.json")
+    parser.add_argument("--clips-dir", default="bench_clips")
+    parser.add_argument("--synthetic", type=int, default=100, help="Number of synthetic sentences")
+    add_stub_arguments(parser, gpt_latency=0.5, gpt_jitter=0.2)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    import check_similarity
+    from batch_translate import translate_arabic
+    from benchmark_pipeline import build_corpus, git_commit, setup_index
+
+    install_stubs(args, seed=args.seed)
+    index, vocabulary = setup_index(args.embeddings, args.clips_dir)
+    if not args.no_render:
+        make_synthetic_clips(vocabulary, args.clips_dir)
+    sentences = build_corpus(args.synthetic, vocabulary, args.seed)
+
+    # Warm the models so the first rate is not charged for first-call overhead
+    check_similarity.translate_text_to_videos(sentences[0], translate_arabic)
+
+    # Same bounds as the app: ESL_RENDER_WORKERS / ESL_RENDER_QUEUE_SIZE unless overridden
+    queue = None
+    if not args.no_render:
+        queue = render_queue.RenderQueue(workers=args.render_workers, max_pending=args.render_queue_size,
+                                         output_dir=os.path.join(args.clips_dir, "_load"),
+                                         video_folder=args.clips_dir, retention_s=60.0)
+
+    rng = random.Random(args.seed)
+    results = []
+    try:
+        for rate in (float(r) for r in args.rates.split(",")):
+            result = run_rate(rate, args, sentences, rng, queue)
+            results.append(result)
+            print(f"rate {rate:6.2f}/s: {result['throughput_per_s']:6.2f}/s done  "
+                  f"p50 {result['p50_ms']:8.0f} ms  p95 {result['p95_ms']:8.0f} ms  p99 {result['p99_ms']:8.0f} ms  "
+                  f"cpu {result['max_cpu_percent']:5.0f}%  rss {result['max_rss_mb']:7.1f} MB  "
+                  f"errors {result['errors']}  rejected {result['rejected']}  breaker {result['gpt_breaker_state']}")
+    finally:
+        if queue is not None:
+            queue.shutdown()
+
+    saturation = find_saturation(results, args.slo)
+    if saturation is None:
+        print("No saturation within the tested rates.")
+    else:
+        print(f"Saturation at {saturation} sessions/s.")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "commit": git_commit(),
+                "config": vars(args),
+                "index_entries": len(index),
+                "saturation_rate": saturation,
+                "rates": results,
+            }, f, indent=2)
+        print(f"Results saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Timing spans and counters for the translation pipeline, exported in Prometheus text format.
+
+Disabled unless ESL_METRICS is set (or enable() is called); when disabled,
+span() returns a shared no-op context manager and the counter helpers return
+immediately. ESL_METRICS_PORT serves the metrics over HTTP at /metrics, alongside any
+routes registered with add_route (e.g. the /ready check from warmup.py).
+"""
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("ESL_METRICS", "").lower() not in ("", "0", "false", "no")
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "esl_stage_seconds": "Time spent in each pipeline stage.",
+    "esl_cache_hits_total": "Lookups answered from a cache.",
+    "esl_cache_misses_total": "Lookups that missed a cache.",
+    "esl_phrase_matches_total": "Phrases matched in the phrase dictionary.",
+    "esl_ready": "1 once the startup warm-up has finished, 0 if it failed.",
+    "esl_gpt_calls_total": "Semantic similarity requests sent to GPT.",
+    "esl_gpt_errors_total": "Semantic similarity requests to GPT that failed or timed out.",
+    "esl_gpt_budget_exhausted_total": "Semantic similarity requests not sent because the translation's GPT time budget was spent.",
+    "esl_gpt_short_circuits_total": "Semantic similarity requests not sent because the circuit breaker was open.",
+    "esl_circuit_breaker_state": "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+    "esl_circuit_breaker_transitions_total": "Circuit breaker state changes, by new state.",
+    "esl_degraded_verdicts_total": "Borderline matches decided by the degraded-mode similarity threshold.",
+    "esl_unmatched_words_total": "Words for which no video was found.",
+    "esl_similarity_band_total": "Best-match similarity scores by band.",
+    "esl_local_verdicts_total": "Borderline matches decided by the local verifier.",
+    "esl_verifier_escalations_total": "Borderline matches the local verifier escalated to GPT.",
+    "esl_gloss_skipped_words_total": "Non-signed words skipped before lookup (lookups saved).",
+    "esl_arabic_direct_matches_total": "Arabic words matched directly in the Arabic-side index.",
+    "esl_arabic_fallbacks_total": "Runs of Arabic words sent to machine translation after no direct match.",
+}
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_server = None
+_routes = {}
+
+
+def enable(flag=True):
+    """Turn metric collection on or off at runtime."""
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    """Drop every collected value."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """Add value to a counter."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """Set a gauge to value."""
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(DEFAULT_BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(DEFAULT_BUCKETS, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe("esl_stage_seconds", time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(stage):
+    """Context manager timing a pipeline stage into esl_stage_seconds{stage=...}."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(stage)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def export_text():
+    """Render every metric in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {k: (list(v[0]), v[1], v[2]) for k, v in _histograms.items()}
+
+    lines = []
+
+    def header(name, kind, seen):
+        if name not in seen:
+            seen.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter", seen)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), value in sorted(gauges.items()):
+        header(name, "gauge", seen)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+        header(name, "histogram", seen)
+        cumulative = 0
+        for bound, bucket_count in zip(DEFAULT_BUCKETS, buckets):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path):
+    """Write the current metrics to a file (e.g. for a node-exporter textfile collector)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(export_text())
+    os.replace(tmp_path, path)
+
+
+def add_route(path, handler):
+    """Serve handler() -> (status code, text body) at path on the metrics server."""
+    _routes[path] = handler
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            status, text, content_type = 200, export_text(), "text/plain; version=0.0.4; charset=utf-8"
+        elif path in _routes:
+            status, text = _routes[path]()
+            content_type = "text/plain; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """Serve /metrics (and added routes) from a background thread. Safe to call on every Streamlit rerun."""
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        if port is None:
+            port = int(os.environ.get("ESL_METRICS_PORT", "9464"))
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=_server.serve_forever, name="esl-metrics", daemon=True)
+    thread.start()
+    return _server
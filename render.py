@@ -0,0 +1,96 @@
+from moviepy.editor import VideoFileClip, concatenate_videoclips
+import contextlib
+import hashlib
+import os
+import threading
+import time
+import metrics
+
+video_folder = "ESL_Processed"
+output_dir = "output"
+
+# Videos rendered ahead of time (see warmup.py), reused for identical sequences
+prerender_dir = os.environ.get("ESL_PRERENDER_DIR", os.path.join(output_dir, "prerendered"))
+
+
+@contextlib.contextmanager
+def _stage(stage, timings):
+    # metrics span, plus a copy of the duration for callers in another process (see render_queue)
+    start = time.perf_counter()
+    with metrics.span(stage):
+        yield
+    if timings is not None:
+        timings.setdefault(stage, []).append(time.perf_counter() - start)
+
+
+def concatenate_videos(video_sequence, output_path=None, video_folder=video_folder, on_missing=None, logger='bar',
+                       timings=None):
+    """Concatenate the ESL clips for a video sequence into one mp4.
+
+    Returns the output path, or None when none of the clips exist. The video
+    is encoded to a temporary file and moved into place when complete, so
+    output_path never holds a half-written video (other requests and later
+    runs reuse existing files, see find_prerendered).
+    on_missing is called with the video name for every clip that is not found;
+    logger is passed to MoviePy (None silences the progress bar). If timings
+    is a dict, the clip_load and encode durations are appended to it by stage.
+    """
+    clips = []
+
+    # Load each video file using moviepy
+    for video in video_sequence:
+        video_path = os.path.join(video_folder, f"{video}.mp4")
+
+        if os.path.exists(video_path):
+            with _stage("clip_load", timings):
+                clip = VideoFileClip(video_path)
+            clips.append(clip)
+        elif on_missing:
+            on_missing(video)
+
+    if not clips:
+        return None
+
+    try:
+        # Concatenate the clips
+        final_clip = concatenate_videoclips(clips)
+
+        if output_path is None:
+            output_path = os.path.join(output_dir, "combined_video.mp4")
+
+        # Ensure the output directory exists
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        # Save the final concatenated video, keeping the .mp4 extension for ffmpeg
+        root, ext = os.path.splitext(output_path)
+        partial_path = f"{root}.partial-{os.getpid()}-{threading.get_ident()}{ext}"
+        try:
+            with _stage("encode", timings):
+                final_clip.write_videofile(partial_path, codec='libx264', audio=False, logger=logger)
+            os.replace(partial_path, output_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+    finally:
+        for clip in clips:
+            clip.close()
+
+    return output_path
+
+
+def missing_videos(video_sequence, video_folder=video_folder):
+    """Names in video_sequence that have no clip in video_folder."""
+    return [video for video in video_sequence if not os.path.exists(os.path.join(video_folder, f"{video}.mp4"))]
+
+
+def sequence_path(video_sequence, directory):
+    """Output file for a video sequence; identical sequences map to the same file."""
+    digest = hashlib.sha1("|".join(video_sequence).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, f"{digest}.mp4")
+
+
+def find_prerendered(video_sequence, directory=None):
+    """Path of an already rendered video for this sequence, or None."""
+    path = sequence_path(video_sequence, directory or prerender_dir)
+    return path if os.path.exists(path) else None
@@ -0,0 +1,171 @@
+"""Render job queue backed by a bounded process pool.
+
+Video encoding runs in worker processes instead of the Streamlit script
+thread. Jobs get an ID that can be polled or cancelled, and submit() raises
+QueueFull once max_pending jobs are queued or running, so the number of
+render workers - not the number of clicks - bounds CPU use.
+"""
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from render import concatenate_videos
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+UNKNOWN = "unknown"
+
+
+class QueueFull(Exception):
+    """Raised when the render queue has no room for another job."""
+
+
+class _Job:
+    __slots__ = ("future", "output_path", "cancelled", "finished_at")
+
+    def __init__(self, future, output_path):
+        self.future = future
+        self.output_path = output_path
+        self.cancelled = False
+        self.finished_at = None
+
+
+def _render(video_sequence, output_path, video_folder):
+    """Worker entry point; returns (output path or None, {stage: [seconds]}).
+
+    Spans recorded in a worker never reach the app's /metrics, so the stage
+    timings go back to the parent, which observes them in _finished.
+    """
+    timings = {}
+    path = concatenate_videos(video_sequence, output_path, video_folder=video_folder, logger=None, timings=timings)
+    return path, timings
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class RenderQueue:
+    """Bounded queue of render jobs running on a process pool.
+
+    workers defaults to ESL_RENDER_WORKERS (2) and max_pending to
+    ESL_RENDER_QUEUE_SIZE (4 per worker). Finished jobs and their videos are
+    forgotten after retention_s seconds.
+    """
+
+    def __init__(self, workers=None, max_pending=None, output_dir=os.path.join("output", "jobs"),
+                 video_folder="ESL_Processed", retention_s=600.0):
+        self.workers = workers or int(os.environ.get("ESL_RENDER_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.environ.get("ESL_RENDER_QUEUE_SIZE", str(4 * self.workers)))
+        self.output_dir = output_dir
+        self.video_folder = video_folder
+        self.retention_s = retention_s
+        self._jobs = {}
+        self._lock = threading.Lock()
+        # Spawned workers only import the renderer, not the models loaded in the app process
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        os.makedirs(output_dir, exist_ok=True)
+
+    def submit(self, video_sequence):
+        """Queue a render of video_sequence and return its job ID. Raises QueueFull when busy."""
+        with self._lock:
+            self._prune()
+            if self._active() >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} render jobs already pending")
+            job_id = uuid.uuid4().hex
+            output_path = os.path.join(self.output_dir, f"{job_id}.mp4")
+            future = self._pool.submit(_render, list(video_sequence), output_path, self.video_folder)
+            job = self._jobs[job_id] = _Job(future, output_path)
+        future.add_done_callback(lambda _: self._finished(job))
+        return job_id
+
+    def status(self, job_id):
+        """One of queued, running, done, failed, cancelled or unknown."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return UNKNOWN
+        if job.cancelled or job.future.cancelled():
+            return CANCELLED
+        if not job.future.done():
+            return RUNNING if job.future.running() else QUEUED
+        if job.future.exception() is not None or job.future.result()[0] is None:
+            return FAILED
+        return DONE
+
+    def result(self, job_id):
+        """Output path of a finished job, or None."""
+        if self.status(job_id) != DONE:
+            return None
+        return self._jobs[job_id].future.result()[0]
+
+    def error(self, job_id):
+        """Exception raised by a failed job, or None."""
+        job = self._jobs.get(job_id)
+        if job is None or not job.future.done() or job.future.cancelled():
+            return None
+        return job.future.exception()
+
+    def cancel(self, job_id):
+        """Cancel a job. Queued jobs never start; a running job's output is discarded."""
+        job = self._jobs.get(job_id)
+        if job is None or job.cancelled:
+            return False
+        job.cancelled = True
+        if not job.future.cancel() and job.future.done():
+            _remove(job.output_path)
+        return True
+
+    def wait(self, job_id, timeout=None, poll_interval=0.25, on_poll=None):
+        """Poll until the job leaves the queued/running states or timeout passes; returns its status."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status not in (QUEUED, RUNNING):
+                return status
+            if deadline is not None and time.monotonic() >= deadline:
+                return status
+            if on_poll:
+                on_poll(status)
+            time.sleep(poll_interval)
+
+    def pending(self):
+        """Number of jobs queued or running."""
+        with self._lock:
+            return self._active()
+
+    def worker_pids(self):
+        """Process IDs of the live render workers (for resource sampling)."""
+        return list(getattr(self._pool, "_processes", None) or ())
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _active(self):
+        # Cancelled jobs that are already running still hold a worker until they finish
+        return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    def _finished(self, job):
+        job.finished_at = time.monotonic()
+        if job.cancelled:
+            _remove(job.output_path)
+        if not job.future.cancelled() and job.future.exception() is None:
+            for stage, durations in job.future.result()[1].items():
+                for seconds in durations:
+                    metrics.observe("esl_stage_seconds", seconds, stage=stage)
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.retention_s]
+        for job_id in expired:
+            _remove(self._jobs.pop(job_id).output_path)
@@ -0,0 +1,114 @@
+"""Bounded, TTL'd cache of sentence translation results.
+
+Entries live in an in-process LRU and, when a path is given, in a SQLite file
+shared by every worker process on the box. Keys already include the index
+version, so entries from an older embedding store are never returned; they
+age out through the TTL and size bounds.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(*parts):
+    """Stable hash of the parts that decide a result."""
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SentenceCache:
+    """LRU + TTL cache of JSON-serializable values, optionally backed by SQLite."""
+
+    def __init__(self, maxsize=1024, ttl=3600.0, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if path:
+            with self._connect() as db:
+                db.execute("CREATE TABLE IF NOT EXISTS sentence_cache "
+                           "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+
+    @classmethod
+    def from_env(cls):
+        """ESL_SENTENCE_CACHE_SIZE (0 disables), ESL_SENTENCE_CACHE_TTL and ESL_SENTENCE_CACHE_PATH."""
+        return cls(maxsize=int(os.environ.get("ESL_SENTENCE_CACHE_SIZE", "1024")),
+                   ttl=float(os.environ.get("ESL_SENTENCE_CACHE_TTL", "3600")),
+                   path=os.environ.get("ESL_SENTENCE_CACHE_PATH") or None)
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def _connect(self):
+        # One connection per thread; WAL lets worker processes read while another writes
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        """Return the cached value, or None when missing or expired."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if not self.path:
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT value, expires FROM sentence_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Sentence cache read failed: {e}")
+            return None
+        if row is None or row[1] <= now:
+            return None
+        value = json.loads(row[0])
+        self._remember(key, value, row[1])
+        return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        expires = time.time() + self.ttl
+        self._remember(key, value, expires)
+        if not self.path:
+            return
+        try:
+            with self._connect() as db:
+                db.execute("INSERT OR REPLACE INTO sentence_cache (key, value, expires) VALUES (?, ?, ?)",
+                           (key, json.dumps(value, ensure_ascii=False), expires))
+                db.execute("DELETE FROM sentence_cache WHERE expires <= ?", (time.time(),))
+                db.execute("DELETE FROM sentence_cache WHERE key NOT IN "
+                           "(SELECT key FROM sentence_cache ORDER BY expires DESC LIMIT ?)", (self.maxsize,))
+        except sqlite3.Error as e:
+            print(f"Sentence cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with self._connect() as db:
+                db.execute("DELETE FROM sentence_cache")
+
+    def _remember(self, key, value, expires):
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -0,0 +1,193 @@
+"""Sign embedding index with float32, float16 or int8 storage.
+
+Convert the embedding JSON to a compact .npz once, so startup skips building
+the Python-float dictionary, and point ESL_INDEX_PATH at it:
+
+    python sign_index.py video_embeddings_main.json --output video_embeddings_main.npz --dtype int8
+"""
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# Rows are scored in blocks so float16/int8 storage is only widened a slice at a time
+BLOCK_SIZE = 4096
+
+
+def store_version(path):
+    """(path, mtime_ns, size) of an embedding store, used to notice when it is rebuilt."""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+class SignIndex:
+    """Normalized sign embedding matrix with float32, float16 or int8 storage.
+
+    Rows are L2-normalized up front, so a dot product with a normalized query
+    is the cosine similarity. int8 storage keeps one float32 scale per row.
+    """
+
+    def __init__(self, words, video_paths, embeddings, dtype="float32"):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported index dtype '{dtype}', expected one of {SUPPORTED_DTYPES}")
+
+        self.words = list(words)
+        self.video_paths = list(video_paths)
+        self.dtype = dtype
+        self.source = None
+        self._version = None
+
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(self.words), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.maximum(norms, 1e-12)
+
+        self.scales = None
+        if dtype == "int8":
+            max_abs = np.abs(matrix).max(axis=1)
+            self.scales = (np.maximum(max_abs, 1e-12) / 127.0).astype(np.float32)
+            self.matrix = np.round(matrix / self.scales[:, None]).astype(np.int8)
+        else:
+            self.matrix = np.ascontiguousarray(matrix.astype(dtype))
+
+    @classmethod
+    def from_dict(cls, video_embeddings, dtype="float32"):
+        """Build an index from the {word: {"video_path", "embedding"}} mapping."""
+        words = list(video_embeddings.keys())
+        video_paths = [video_embeddings[w]['video_path'] for w in words]
+        embeddings = [np.asarray(video_embeddings[w]['embedding'], dtype=np.float32).reshape(-1) for w in words]
+        if not embeddings:
+            return cls([], [], np.empty((0, 0), dtype=np.float32), dtype=dtype)
+        return cls(words, video_paths, np.stack(embeddings), dtype=dtype)
+
+    @classmethod
+    def from_json(cls, path, dtype="float32"):
+        """Load the embedding JSON written by videoembeddings.py."""
+        with open(path, 'r') as f:
+            video_embeddings = json.load(f)
+        return cls.from_dict(video_embeddings, dtype=dtype)
+
+    @classmethod
+    def load(cls, path, dtype=None):
+        """Load an index from a .npz file (see save) or the embedding JSON.
+
+        dtype defaults to the storage the .npz was saved with (float32 for JSON).
+        """
+        source = store_version(path)
+        if not path.endswith(".npz"):
+            index = cls.from_json(path, dtype=dtype or "float32")
+            index.source = source
+            return index
+
+        data = np.load(path, allow_pickle=False)
+        index = cls.__new__(cls)
+        index.words = data['words'].tolist()
+        index.video_paths = data['video_paths'].tolist()
+        index.dtype = str(data['dtype'])
+        index.matrix = data['matrix']
+        index.scales = data['scales'] if index.dtype == "int8" else None
+        index._version = None
+        if dtype is not None and index.dtype != dtype:
+            index = cls(index.words, index.video_paths, index.dequantize(), dtype=dtype)
+        index.source = source
+        return index
+
+    def is_stale(self):
+        """True when the store this index was loaded from has been rebuilt since."""
+        if self.source is None:
+            return False
+        try:
+            return store_version(self.source[0]) != self.source
+        except OSError:
+            return False
+
+    @property
+    def version(self):
+        """Identifies the index contents, for cache keys: the store's mtime/size or a content hash."""
+        if self._version is None:
+            if self.source is not None:
+                self._version = f"{self.source[1]}-{self.source[2]}"
+            else:
+                digest = hashlib.sha1()
+                digest.update("\n".join(self.words).encode("utf-8"))
+                digest.update(np.ascontiguousarray(self.matrix).tobytes())
+                self._version = digest.hexdigest()
+        return self._version
+
+    def save(self, path):
+        """Save the index in its compact storage format as a .npz file.
+
+        The file is written under a temporary name and moved into place, since
+        a running app reloads the store as soon as it changes.
+        """
+        if not path.endswith(".npz"):
+            path += ".npz"
+        tmp_path = f"{path[:-4]}.tmp-{os.getpid()}.npz"
+        scales = self.scales if self.scales is not None else np.empty(0, dtype=np.float32)
+        np.savez(tmp_path,
+                 words=np.array(self.words),
+                 video_paths=np.array(self.video_paths),
+                 dtype=np.array(self.dtype),
+                 matrix=self.matrix,
+                 scales=scales)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.words)
+
+    def memory_bytes(self):
+        """Bytes held by the embedding storage (matrix plus int8 scales)."""
+        total = self.matrix.nbytes
+        if self.scales is not None:
+            total += self.scales.nbytes
+        return total
+
+    def dequantize(self):
+        """Return the stored embeddings as a float32 matrix."""
+        if self.scales is not None:
+            return self.matrix.astype(np.float32) * self.scales[:, None]
+        return self.matrix.astype(np.float32)
+
+    def scores(self, query_embedding):
+        """Cosine similarity of a query embedding against every row."""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        if self.dtype == "float32":
+            return self.matrix @ query
+
+        result = np.empty(len(self.words), dtype=np.float32)
+        for start in range(0, len(self.words), BLOCK_SIZE):
+            block = self.matrix[start:start + BLOCK_SIZE].astype(np.float32)
+            result[start:start + BLOCK_SIZE] = block @ query
+        if self.scales is not None:
+            result *= self.scales
+        return result
+
+    def search(self, query_embedding, top_k=1):
+        """Return the top_k (word, video_path, similarity) matches, best first."""
+        if not self.words:
+            return []
+        scores = self.scores(query_embedding)
+        top_k = min(top_k, len(scores))
+        if top_k == 1:
+            best = [int(np.argmax(scores))]
+        else:
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+            best = candidates[np.argsort(-scores[candidates])]
+        return [(self.words[i], self.video_paths[i], float(scores[i])) for i in best]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("store", help="Embedding JSON written by videoembeddings.py")
+    parser.add_argument("--output", help="Output .npz file (default: the store name with .npz)")
+    parser.add_argument("--dtype", default="float32", choices=SUPPORTED_DTYPES)
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.store)[0] + ".npz"
+    index = SignIndex.load(args.store, dtype=args.dtype)
+    index.save(output)
+    print(f"Saved {len(index)} entries ({index.memory_bytes() / 1e6:.1f} MB, {index.dtype}) to '{output}'.")
@@ -0,0 +1,256 @@
+"""Chunked speech recognition with pluggable engines and energy-based voice activity detection.
+
+Audio comes in as 16-bit PCM frames from a WAV file/stream or the microphone.
+Frames are grouped into speech chunks at pauses, and each finished chunk is
+recognized on a worker thread while capture continues, so translation can
+start before the speaker is done.
+
+    python speech.py recording.wav --engine sphinx --language en-US
+"""
+import abc
+import argparse
+import itertools
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import speech_recognition as sr
+
+FRAME_MS = 30
+
+# Bounds for a calibrated energy threshold: the lower one keeps hiss out, the upper one
+# keeps a calibration sample that already contains speech from hiding later speech
+MIN_ENERGY_THRESHOLD = 300.0
+MAX_ENERGY_THRESHOLD = 2000.0
+
+
+class Recognizer(abc.ABC):
+    """Turns one chunk of speech (sr.AudioData) into text, or None if nothing was understood."""
+
+    def __init__(self, language='ar-SA'):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        try:
+            return self._recognize(audio)
+        except sr.UnknownValueError:
+            return None
+
+    @abc.abstractmethod
+    def _recognize(self, audio):
+        """Return the text of one chunk; raise sr.UnknownValueError when nothing was understood."""
+
+
+class GoogleRecognizer(Recognizer):
+    """Google Web Speech API (remote)."""
+
+    def _recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class SphinxRecognizer(Recognizer):
+    """CMU PocketSphinx (local, offline). Needs the pocketsphinx package and a model for the language."""
+
+    def _recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio, language=self.language)
+
+
+class WhisperRecognizer(Recognizer):
+    """OpenAI Whisper running locally (offline). Needs the openai-whisper package."""
+
+    LANGUAGES = {'ar': 'arabic', 'en': 'english'}
+
+    def __init__(self, language='ar-SA', model='base'):
+        super().__init__(language)
+        self.model = model
+
+    def _recognize(self, audio):
+        language = self.LANGUAGES.get(self.language.split('-')[0], self.language)
+        return self.recognizer.recognize_whisper(audio, model=self.model, language=language).strip() or None
+
+
+ENGINES = {
+    "google": GoogleRecognizer,
+    "sphinx": SphinxRecognizer,
+    "whisper": WhisperRecognizer,
+}
+
+
+def get_recognizer(engine="google", language='ar-SA'):
+    """Create a recognizer for one of ENGINES."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown speech engine '{engine}', expected one of {', '.join(ENGINES)}")
+    return ENGINES[engine](language=language)
+
+
+def wav_frames(source, frame_ms=FRAME_MS):
+    """Read a 16-bit WAV file path or file object.
+
+    Returns (frames, sample_rate, sample_width) with frames as a list; stereo
+    input is mixed down to mono.
+    """
+    with wave.open(source, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        sample_width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        data = wav.readframes(wav.getnframes())
+
+    if sample_width != 2:
+        raise ValueError("Only 16-bit PCM WAV audio is supported.")
+    if channels > 1:
+        samples = np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+        data = samples.mean(axis=1).astype(np.int16).tobytes()
+
+    frame_bytes = int(sample_rate * frame_ms / 1000) * sample_width
+    frames = [data[start:start + frame_bytes] for start in range(0, len(data), frame_bytes)]
+    return frames, sample_rate, sample_width
+
+
+def microphone_frames(microphone, frame_ms=FRAME_MS, max_duration_s=30.0):
+    """Yield raw frames from an open sr.Microphone source for up to max_duration_s seconds."""
+    frame_samples = int(microphone.SAMPLE_RATE * frame_ms / 1000)
+    deadline = time.monotonic() + max_duration_s
+    while time.monotonic() < deadline:
+        yield microphone.stream.read(frame_samples)
+
+
+def frame_energy(frame):
+    """Root-mean-square amplitude of a 16-bit PCM frame."""
+    samples = np.frombuffer(frame, dtype=np.int16)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+
+def calibrate(frames, percentile=10):
+    """Energy threshold for speech: 3x the noise floor, taken as a low percentile of frame energies.
+
+    Pass a whole recording when one is available (see wav_frames), so pauses
+    anywhere in it set the floor rather than whatever audio comes first.
+    """
+    energies = [frame_energy(frame) for frame in frames]
+    noise = float(np.percentile(energies, percentile)) if energies else 0.0
+    return min(MAX_ENERGY_THRESHOLD, max(MIN_ENERGY_THRESHOLD, 3.0 * noise))
+
+
+def chunk_speech(frames, sample_rate, sample_width, frame_ms=FRAME_MS, energy_threshold=None,
+                 silence_ms=500, end_silence_ms=2000, max_chunk_s=8.0, min_speech_ms=200, calibration_ms=300):
+    """Group PCM frames into speech chunks, yielding one sr.AudioData per chunk.
+
+    A chunk ends after silence_ms of quiet or max_chunk_s of audio; chunks with
+    less than min_speech_ms of speech are dropped. Capture stops after
+    end_silence_ms of quiet following a kept chunk. Without an energy_threshold,
+    the first calibration_ms of audio sets it (see calibrate) and is then
+    processed like the rest, so speech at the very start is kept.
+    """
+    silence_frames = max(1, silence_ms // frame_ms)
+    end_silence_frames = max(1, end_silence_ms // frame_ms)
+    max_chunk_frames = max(1, int(max_chunk_s * 1000 // frame_ms))
+    min_speech_frames = max(1, min_speech_ms // frame_ms)
+    calibration_frames = max(1, calibration_ms // frame_ms)
+
+    if energy_threshold is None:
+        frames = iter(frames)
+        preroll = list(itertools.islice(frames, calibration_frames))
+        energy_threshold = calibrate(preroll)
+        frames = itertools.chain(preroll, frames)
+
+    chunk = []
+    speech_frames = 0
+    quiet_frames = 0
+    heard_speech = False
+
+    def finish():
+        audio = sr.AudioData(b"".join(chunk), sample_rate, sample_width)
+        return audio if speech_frames >= min_speech_frames else None
+
+    for frame in frames:
+        energy = frame_energy(frame)
+        if energy >= energy_threshold:
+            chunk.append(frame)
+            speech_frames += 1
+            quiet_frames = 0
+        elif chunk:
+            chunk.append(frame)
+            quiet_frames += 1
+        else:
+            quiet_frames += 1
+
+        if chunk and (quiet_frames >= silence_frames or len(chunk) >= max_chunk_frames):
+            audio = finish()
+            if audio is not None:
+                # Only real speech starts the end-of-capture countdown; a click or cough does not
+                heard_speech = True
+                yield audio
+            chunk = []
+            speech_frames = 0
+
+        if heard_speech and not chunk and quiet_frames >= end_silence_frames:
+            return
+
+    if chunk:
+        audio = finish()
+        if audio is not None:
+            yield audio
+
+
+def paced(frames, frame_ms=FRAME_MS):
+    """Release frames at real-time speed, to replay a recording as if it were live."""
+    next_time = time.monotonic()
+    for frame in frames:
+        next_time += frame_ms / 1000
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield frame
+
+
+def _transcribe_chunk(recognizer, audio, process):
+    text = recognizer.transcribe(audio)
+    result = process(text) if (process and text) else None
+    return text, result
+
+
+def transcribe_stream(frames, sample_rate, sample_width, recognizer, process=None, **vad_options):
+    """Recognize speech chunk by chunk while audio is still being captured.
+
+    Each finished chunk is recognized on a worker thread (and passed to
+    process(text), e.g. translation and sign lookup). Yields (text, result)
+    in speech order as soon as each chunk is done; text is None for chunks
+    that were not understood.
+    """
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="esl-speech") as pool:
+        pending = deque()
+        for audio in chunk_speech(frames, sample_rate, sample_width, **vad_options):
+            pending.append(pool.submit(_transcribe_chunk, recognizer, audio, process))
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav", help="16-bit PCM WAV file")
+    parser.add_argument("--engine", default="sphinx", choices=sorted(ENGINES))
+    parser.add_argument("--language", default="en-US")
+    parser.add_argument("--silence-ms", type=int, default=500)
+    parser.add_argument("--realtime", action="store_true", help="Replay the file at speaking speed")
+    args = parser.parse_args()
+
+    recognizer = get_recognizer(args.engine, args.language)
+    frames, sample_rate, sample_width = wav_frames(args.wav)
+    energy_threshold = calibrate(frames)
+    if args.realtime:
+        frames = paced(frames)
+
+    start = time.perf_counter()
+    for text, _ in transcribe_stream(frames, sample_rate, sample_width, recognizer,
+                                     energy_threshold=energy_threshold, silence_ms=args.silence_ms):
+        print(f"[{time.perf_counter() - start:7.2f}s] {text if text else '(not understood)'}")
+
+
+if __name__ == "__main__":
+    main()
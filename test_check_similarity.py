@@ -0,0 +1,141 @@
+import os
+import time
+
+import pytest
+
+# No model is loaded: GPT-4 is a stub and embeddings are never computed
+pytest.importorskip("numpy")
+
+import numpy as np
+
+import check_similarity
+from bench_stubs import StubChatClient
+from circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from result_cache import SentenceCache
+from sign_index import SignIndex
+from verifier import LocalVerifier
+
+
+@pytest.fixture
+def gpt(monkeypatch):
+    """Install a stub client and a fresh breaker; returns a function that does so with options."""
+    def install(failure_threshold=3, timeout=0.2, **stub_options):
+        stub = StubChatClient(seed=0, **stub_options)
+        breaker = CircuitBreaker("test", failure_threshold=failure_threshold, slow_call_s=timeout,
+                                 reset_timeout_s=60.0)
+        monkeypatch.setattr(check_similarity, "client", stub)
+        monkeypatch.setattr(check_similarity, "gpt_breaker", breaker)
+        monkeypatch.setattr(check_similarity, "GPT_TIMEOUT", timeout)
+        monkeypatch.setattr(check_similarity, "log_verdicts", False)
+        return stub, breaker
+    return install
+
+
+def test_errors_open_the_breaker(gpt):
+    stub, breaker = gpt(failure_threshold=3, error_rate=1.0)
+    verdicts = [check_similarity.check_semantic_similarity("home", "house", 0.6) for _ in range(6)]
+    assert stub.calls == 3
+    assert breaker.state == OPEN
+    # Degraded mode: a plain similarity threshold
+    assert verdicts == [0.6 >= check_similarity.DEGRADED_THRESHOLD] * 6
+    assert not check_similarity.check_semantic_similarity("home", "cat", 0.47)
+
+
+def test_slow_calls_time_out_and_open_the_breaker(gpt):
+    stub, breaker = gpt(failure_threshold=2, timeout=0.1, slow_rate=1.0, slow_latency=2.0)
+    start = time.perf_counter()
+    for _ in range(5):
+        check_similarity.check_semantic_similarity("home", "house", 0.6)
+    elapsed = time.perf_counter() - start
+    assert breaker.state == OPEN
+    assert stub.calls == 2
+    assert elapsed < 0.5
+
+
+def test_translation_budget_bounds_latency(gpt):
+    # A breaker that never opens: only the budget keeps the sentence bounded
+    stub, breaker = gpt(failure_threshold=100, timeout=0.3, slow_rate=1.0, slow_latency=2.0)
+    start = time.perf_counter()
+    with check_similarity.gpt_budget(0.5):
+        for _ in range(10):
+            check_similarity.check_semantic_similarity("home", "house", 0.6)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.8
+    assert stub.calls <= 2
+    assert breaker.state == CLOSED
+
+
+def test_healthy_service_is_used(gpt):
+    stub, breaker = gpt(latency=0.01)
+    verdict = check_similarity.check_semantic_similarity("home", "house", 0.6)
+    assert isinstance(verdict, bool)
+    assert stub.calls == 1
+    assert breaker.state == CLOSED
+
+
+def make_index(words, seed=0):
+    rng = np.random.default_rng(seed)
+    return SignIndex(words, [f"{w}.mp4" for w in words], rng.standard_normal((len(words), 8)))
+
+
+@pytest.fixture
+def cached_pipeline(monkeypatch):
+    """A sentence cache in front of a fake pipeline that returns the words and counts its calls."""
+    calls = []
+
+    def fake_translate(processed_input, similarity_threshold):
+        calls.append(processed_input)
+        return processed_input.split()
+
+    monkeypatch.setattr(check_similarity, "_translate_processed_to_videos", fake_translate)
+    monkeypatch.setattr(check_similarity, "sentence_cache", SentenceCache(maxsize=8, ttl=60.0))
+    monkeypatch.setattr(check_similarity, "video_index", make_index(["good", "morning"]))
+    monkeypatch.setattr(check_similarity, "gloss_filter", None)
+    monkeypatch.setattr(check_similarity, "local_verifier", None)
+    monkeypatch.setattr(check_similarity, "VERIFIER_MODE", "gpt")
+    # Degraded-mode tests leave the flag set on this thread; the real pipeline resets it
+    monkeypatch.setattr(check_similarity._request_state, "degraded", False, raising=False)
+    return calls
+
+
+def test_cached_results_are_independent_copies(cached_pipeline):
+    first = check_similarity.translate_sentence_to_videos("good morning")
+    first.append("CORRUPT")
+    second = check_similarity.translate_sentence_to_videos("good morning")
+    second.append("CORRUPT")
+    assert check_similarity.translate_sentence_to_videos("good morning") == ["good", "morning"]
+    assert len(cached_pipeline) == 1
+
+
+def test_new_index_version_changes_the_cache_key(cached_pipeline):
+    key = check_similarity.sentence_cache_key("good morning", 0.8)
+    check_similarity.translate_sentence_to_videos("good morning")
+    check_similarity.set_video_index(make_index(["good", "morning"], seed=1))
+    assert check_similarity.sentence_cache_key("good morning", 0.8) != key
+    check_similarity.translate_sentence_to_videos("good morning")
+    assert len(cached_pipeline) == 2
+
+
+def test_half_written_store_keeps_the_loaded_index(monkeypatch, tmp_path):
+    store = tmp_path / "store.json"
+    store.write_text('{"house": {"video_path": "house.mp4", "embedding": [0.1, 0.2, 0.3]}}')
+    monkeypatch.setenv("ESL_INDEX_PATH", str(store))
+    monkeypatch.setattr(check_similarity, "video_index", None)
+    monkeypatch.setattr(check_similarity, "gloss_filter", None)
+    loaded = check_similarity.get_video_index()
+
+    store.write_text('{"house": {"video_path": "hou')
+    os.utime(store, ns=(loaded.source[1] + 10**9, loaded.source[1] + 10**9))
+    assert check_similarity.get_video_index() is loaded
+
+
+def test_verifier_trained_after_startup_is_picked_up(monkeypatch, tmp_path):
+    path = tmp_path / "verifier.pkl"
+    monkeypatch.setenv("ESL_VERIFIER_PATH", str(path))
+    monkeypatch.setattr(check_similarity, "VERIFIER_MODE", "escalate")
+    monkeypatch.setattr(check_similarity, "local_verifier", None)
+    monkeypatch.setattr(check_similarity, "_verifier_disabled", False)
+    assert check_similarity.get_local_verifier() is None
+
+    LocalVerifier({"weights": [1.0]}).save(str(path))
+    assert check_similarity.get_local_verifier().model == {"weights": [1.0]}
@@ -0,0 +1,30 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from embeddings import get_embeddings, get_embeddings_batch, load_model
+
+
+@pytest.fixture(autouse=True, scope="module")
+def model():
+    try:
+        load_model()
+    except OSError as e:
+        pytest.skip(f"embedding model unavailable: {e}")
+
+
+SAMPLE = ["hello", "how are you", "the teacher gives the student a book", "house", "good morning"]
+
+
+def test_batch_matches_single():
+    batched = get_embeddings_batch(SAMPLE, batch_size=2)
+    assert batched.shape[0] == len(SAMPLE)
+    assert batched.dtype == np.float32
+    for row, text in zip(batched, SAMPLE):
+        np.testing.assert_allclose(row, get_embeddings(text).cpu().numpy()[0], atol=1e-4)
+
+
+def test_batch_of_nothing():
+    assert get_embeddings_batch([]).shape[0] == 0
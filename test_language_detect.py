@@ -0,0 +1,30 @@
+from language_detect import detect_language, split_segments, to_english
+
+
+def test_single_language():
+    assert split_segments("good morning") == [('en', "good morning")]
+    assert split_segments("صباح الخير") == [('ar', "صباح الخير")]
+
+
+def test_mixed_input_is_split_into_runs():
+    assert split_segments("I love صباح الخير my friend") == [
+        ('en', "I love"), ('ar', "صباح الخير"), ('en', "my friend")]
+
+
+def test_digits_and_punctuation_join_a_neighbouring_run():
+    assert split_segments("2024 صباح الخير !") == [('ar', "2024 صباح الخير !")]
+    assert split_segments("meet at 5 في المكتب") == [('en', "meet at 5"), ('ar', "في المكتب")]
+
+
+def test_text_without_letters():
+    assert split_segments("2024 !") == [('en', "2024 !")]
+    assert split_segments("") == []
+
+
+def test_mixed_script_word_follows_its_majority():
+    assert detect_language("Dubaiد") == 'en'
+    assert detect_language("دبيa") == 'ar'
+
+
+def test_to_english_translates_only_arabic():
+    assert to_english("hello صباح الخير", lambda s: "<" + s + ">") == "hello <صباح الخير>"
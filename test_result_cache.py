@@ -0,0 +1,52 @@
+import time
+
+from result_cache import SentenceCache, make_key
+
+
+def test_get_returns_what_was_set():
+    cache = SentenceCache(maxsize=4, ttl=60.0)
+    cache.set("k", ["good", "morning"])
+    assert cache.get("k") == ["good", "morning"]
+    assert cache.get("missing") is None
+
+
+def test_entries_expire_after_ttl():
+    cache = SentenceCache(maxsize=4, ttl=0.05)
+    cache.set("k", ["house"])
+    time.sleep(0.06)
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SentenceCache(maxsize=2, ttl=60.0)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    cache.get("a")
+    cache.set("c", [3])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1] and cache.get("c") == [3]
+
+
+def test_size_zero_disables_the_cache():
+    cache = SentenceCache(maxsize=0)
+    cache.set("k", [1])
+    assert not cache.enabled
+    assert cache.get("k") is None
+
+
+def test_sqlite_file_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SentenceCache(maxsize=4, ttl=60.0, path=path).set("k", ["صباح", "good"])
+    assert SentenceCache(maxsize=4, ttl=60.0, path=path).get("k") == ["صباح", "good"]
+
+
+def test_expired_sqlite_entries_are_not_returned(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SentenceCache(maxsize=4, ttl=0.05, path=path).set("k", [1])
+    time.sleep(0.06)
+    assert SentenceCache(maxsize=4, ttl=0.05, path=path).get("k") is None
+
+
+def test_make_key_depends_on_every_part():
+    assert make_key("good morning", "v1") == make_key("good morning", "v1")
+    assert make_key("good morning", "v1") != make_key("good morning", "v2")
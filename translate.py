@@ -1,4 +1,5 @@
 from transformers import MarianMTModel, MarianTokenizer
+import metrics
 
 # Load the model and tokenizer
 model_name = "Helsinki-NLP/opus-mt-ar-en"
@@ -11,7 +12,8 @@ def translate_arabic_to_english(text):
     inputs = tokenizer(text, return_tensors="pt", padding=True)
     
     # Perform translation
-    translated = model.generate(**inputs)
+    with metrics.span("mt"):
+        translated = model.generate(**inputs)
     
     # Decode the output
     translated_text = tokenizer.decode(translated[0], skip_special_tokens=True)
@@ -0,0 +1,140 @@
+"""Local verifier for borderline word matches, trained from logged GPT-4 verdicts.
+
+A logistic regression on embedding features (cosine similarity, |a - b| and
+a * b of the two words' embeddings) predicts whether GPT-4 would call a pair
+interchangeable. It answers on its own when confident and escalates to
+GPT-4 otherwise.
+
+    python verifier.py --log gpt_verdicts.jsonl --output verifier.pkl
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+
+from embeddings import get_embeddings_batch
+from sign_index import store_version
+
+
+def load_verdicts(path):
+    """Read the JSON Lines verdict log, keeping the latest verdict per word pair."""
+    verdicts = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record.get("verdict"), bool):
+                verdicts[(record["word1"], record["word2"])] = record["verdict"]
+    return [(w1, w2, verdict) for (w1, w2), verdict in verdicts.items()]
+
+
+def pair_features(first, second):
+    """Feature rows for pairs of embedding matrices (one pair per row)."""
+    first = first / np.maximum(np.linalg.norm(first, axis=1, keepdims=True), 1e-12)
+    second = second / np.maximum(np.linalg.norm(second, axis=1, keepdims=True), 1e-12)
+    cosine = np.sum(first * second, axis=1, keepdims=True)
+    return np.hstack([cosine, np.abs(first - second), first * second]).astype(np.float32)
+
+
+def embed_pairs(pairs):
+    words = list(dict.fromkeys(w for pair in pairs for w in pair[:2]))
+    rows = dict(zip(words, get_embeddings_batch(words)))
+    first = np.stack([rows[p[0]] for p in pairs])
+    second = np.stack([rows[p[1]] for p in pairs])
+    return pair_features(first, second)
+
+
+class LocalVerifier:
+    """Predicts GPT-4's yes/no verdict for a word pair, abstaining when unsure."""
+
+    def __init__(self, model, confidence=0.85):
+        self.model = model
+        self.confidence = confidence
+        self.source = None
+        self._digest = None
+
+    @classmethod
+    def train(cls, verdicts, confidence=0.85):
+        """Fit on [(word1, word2, verdict)]; needs both yes and no examples."""
+        labels = np.array([verdict for _, _, verdict in verdicts], dtype=int)
+        if len(set(labels)) < 2:
+            raise ValueError("Need both 'yes' and 'no' verdicts to train the verifier.")
+        from sklearn.linear_model import LogisticRegression
+        model = LogisticRegression(max_iter=1000, class_weight="balanced")
+        model.fit(embed_pairs(verdicts), labels)
+        return cls(model, confidence)
+
+    @classmethod
+    def load(cls, path, confidence=0.85):
+        source = store_version(path)
+        with open(path, 'rb') as f:
+            local = cls(pickle.load(f), confidence)
+        local.source = source
+        return local
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self.model, f)
+
+    def is_stale(self):
+        """True when the file this verifier was loaded from has been retrained since."""
+        if self.source is None:
+            return False
+        try:
+            return store_version(self.source[0]) != self.source
+        except OSError:
+            return False
+
+    @property
+    def version(self):
+        """Identifies the model and confidence, for cache keys: the file's mtime/size or a model hash."""
+        if self.source is not None:
+            return f"{self.source[1]}-{self.source[2]}-{self.confidence}"
+        if self._digest is None:
+            self._digest = hashlib.sha1(pickle.dumps(self.model)).hexdigest()
+        return f"{self._digest}-{self.confidence}"
+
+    def probabilities(self, pairs):
+        """Probability of a 'yes' verdict for each (word1, word2) pair."""
+        return self.model.predict_proba(embed_pairs(pairs))[:, 1]
+
+    def decide(self, word1, word2):
+        """True/False when confident, None to escalate to GPT-4."""
+        probability = float(self.probabilities([(word1, word2)])[0])
+        if probability >= self.confidence:
+            return True
+        if probability <= 1.0 - self.confidence:
+            return False
+        return None
+
+
+def verifier_path():
+    """Where the trained verifier is stored (ESL_VERIFIER_PATH)."""
+    return os.environ.get("ESL_VERIFIER_PATH", "verifier.pkl")
+
+
+def load_from_env():
+    """The verifier configured by ESL_VERIFIER_PATH / ESL_VERIFIER_CONFIDENCE, or None if not trained."""
+    path = verifier_path()
+    if not os.path.exists(path):
+        return None
+    return LocalVerifier.load(path, float(os.environ.get("ESL_VERIFIER_CONFIDENCE", "0.85")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default="gpt_verdicts.jsonl", help="Logged GPT-4 verdicts (JSON Lines)")
+    parser.add_argument("--output", default="verifier.pkl")
+    args = parser.parse_args()
+
+    verdicts = load_verdicts(args.log)
+    print(f"Training on {len(verdicts)} verdicts ({sum(v for _, _, v in verdicts)} yes).")
+    LocalVerifier.train(verdicts).save(args.output)
+    print(f"Verifier saved to '{args.output}'.")
@@ -1,11 +1,21 @@
 import os
 import json
+import argparse
 import numpy as np
-from embeddings import get_embeddings  
+from embeddings import get_embeddings, get_embeddings_batch, multilingual_model_name
 
 
 video_folder = "ESL_Processed"
 
+
+def write_store(video_embeddings, path):
+    """Write an embedding store atomically; the app reloads the file as soon as it changes."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(video_embeddings, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
 def create_video_embedding_dataset():
     video_embeddings = {}
 
@@ -29,9 +39,62 @@ def create_video_embedding_dataset():
             }
 
     # Save the embedding dataset to a JSON file
-    with open('video_embeddings_main.json', 'w') as f:
-        json.dump(video_embeddings, f)
+    write_store(video_embeddings, 'video_embeddings_main.json')
 
     print("Embeddings saved to 'video_embeddings.json'.")
 
-create_video_embedding_dataset()
\ No newline at end of file
+
+def create_multilingual_embedding_dataset(glosses_path=None, output_path='video_embeddings_ar.json', include_english=True):
+    """Build the Arabic-side index with the multilingual model.
+
+    glosses_path is a JSON file mapping each video name to an Arabic label or
+    a list of labels, e.g. {"house": ["منزل", "بيت"]}. The English video names
+    are indexed too unless include_english is False, so Arabic words can still
+    match videos without a gloss.
+    """
+    if not os.path.exists(video_folder):
+        print(f"Video folder '{video_folder}' not found.")
+        return
+
+    glosses = {}
+    if glosses_path:
+        with open(glosses_path, 'r', encoding='utf-8') as f:
+            glosses = json.load(f)
+
+    labels = {}
+    for video_name in sorted(os.listdir(video_folder)):
+        if not video_name.endswith(".mp4"):
+            continue
+        word = video_name.split(".")[0]
+        video_path = os.path.join(video_folder, video_name)
+        arabic = glosses.get(word, [])
+        for label in ([arabic] if isinstance(arabic, str) else arabic):
+            labels.setdefault(label, video_path)
+        if include_english:
+            labels.setdefault(word, video_path)
+
+    print(f"Embedding {len(labels)} labels with '{multilingual_model_name}'.")
+    embeddings = get_embeddings_batch(list(labels), model_name=multilingual_model_name)
+
+    video_embeddings = {
+        label: {"video_path": video_path, "embedding": embedding.tolist()}
+        for (label, video_path), embedding in zip(labels.items(), embeddings)
+    }
+    write_store(video_embeddings, output_path)
+
+    print(f"Embeddings saved to '{output_path}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the sign video embedding index.")
+    parser.add_argument("--multilingual", action="store_true",
+                        help="Build the Arabic-side index with the multilingual model")
+    parser.add_argument("--glosses", help="JSON file mapping video names to Arabic gloss labels")
+    parser.add_argument("--output", default="video_embeddings_ar.json", help="Output file for --multilingual")
+    parser.add_argument("--no-english", action="store_true", help="Index only the Arabic gloss labels")
+    args = parser.parse_args()
+
+    if args.multilingual:
+        create_multilingual_embedding_dataset(args.glosses, args.output, include_english=not args.no_english)
+    else:
+        create_video_embedding_dataset()
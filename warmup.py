@@ -0,0 +1,168 @@
+"""Startup warm-up and readiness reporting.
+
+warm_up() loads the embedding indexes, runs dummy inferences through the
+embedding and translation models, reads the sign clips into the page cache
+and translates (and pre-renders) the most frequent sentences so the first
+real request is served warm. is_ready() and the /ready route on the metrics
+server report when that has finished, for load balancer health checks.
+
+    python warmup.py --sentences frequent_sentences.txt
+"""
+import argparse
+import os
+import threading
+import time
+
+import metrics
+from check_similarity import get_arabic_index, get_video_index, translate_text_to_videos
+from embeddings import get_embeddings, get_embeddings_batch
+from examples import EXAMPLE_SENTENCES
+from render import concatenate_videos, find_prerendered, prerender_dir, sequence_path, video_folder
+
+_state = {"ready": False, "stage": "not started", "error": None, "seconds": None}
+_state_lock = threading.Lock()
+_started = False
+
+
+def _set_stage(stage, **extra):
+    with _state_lock:
+        _state["stage"] = stage
+        _state.update(extra)
+    print(f"Warm-up: {stage}")
+
+
+def is_ready():
+    return _state["ready"]
+
+
+def status():
+    """Copy of the warm-up state: ready, stage, error and seconds taken."""
+    with _state_lock:
+        return dict(_state)
+
+
+def _ready_route():
+    state = status()
+    if state["ready"]:
+        return 200, f"ready ({state['seconds']:.1f}s warm-up)\n"
+    if state["error"]:
+        return 503, f"warm-up failed: {state['error']}\n"
+    return 503, f"warming up: {state['stage']}\n"
+
+
+metrics.add_route("/ready", _ready_route)
+
+
+def warm_page_cache(paths, max_bytes=512 * 1024 * 1024, block_size=1 << 20):
+    """Read files once (up to max_bytes in total) so later clip loads hit the OS page cache."""
+    total = 0
+    for path in paths:
+        if total >= max_bytes:
+            break
+        try:
+            with open(path, 'rb') as f:
+                while True:
+                    block = f.read(block_size)
+                    if not block:
+                        break
+                    total += len(block)
+        except OSError:
+            continue
+    return total
+
+
+def default_sentences():
+    """The app's example sentences in English and Arabic."""
+    return [s for pair in EXAMPLE_SENTENCES for s in pair]
+
+
+def warm_up(sentences=None, prerender=True, warm_clips=True, sentences_file=None):
+    """Warm models, indexes, caches and clips; marks the process ready when done.
+
+    sentences_file (one sentence per line) is read when sentences is None.
+    Failures in optional steps are printed and skipped; a failure to read the
+    sentences file or to load the models or the index leaves the process not
+    ready, with the error recorded.
+    """
+    start = time.perf_counter()
+    try:
+        _set_stage("reading sentences")
+        if sentences is None:
+            sentences = read_sentence_file(sentences_file) if sentences_file else default_sentences()
+
+        from translate import translate_arabic_to_english
+
+        _set_stage("loading index")
+        index = get_video_index()
+        get_arabic_index()
+
+        _set_stage("warming models")
+        get_embeddings("hello")
+        get_embeddings_batch(["good morning", "how are you"])
+        translate_arabic_to_english("صباح الخير")
+
+        _set_stage("translating frequent sentences")
+        sequences = []
+        for sentence in sentences:
+            try:
+                sequences.append(translate_text_to_videos(sentence, translate_arabic_to_english))
+            except Exception as e:
+                print(f"Warm-up could not translate '{sentence}': {e}")
+
+        if warm_clips:
+            _set_stage("reading clips into page cache")
+            names = {v for seq in sequences for v in seq}
+            clip_paths = [os.path.join(video_folder, f"{name}.mp4") for name in names]
+            # Frequent sentences first, then the other clips in the index
+            seen = set(clip_paths)
+            clip_paths += [path for path in index.video_paths if path not in seen]
+            read = warm_page_cache(clip_paths)
+            print(f"Warm-up read {read / 1e6:.1f} MB of clips.")
+
+        if prerender:
+            _set_stage("pre-rendering frequent sentences")
+            for sequence in sequences:
+                if sequence and not find_prerendered(sequence):
+                    try:
+                        concatenate_videos(sequence, sequence_path(sequence, prerender_dir), logger=None)
+                    except Exception as e:
+                        print(f"Warm-up could not render {sequence}: {e}")
+    except Exception as e:
+        _set_stage("failed", error=str(e))
+        metrics.set_gauge("esl_ready", 0)
+        return False
+
+    elapsed = time.perf_counter() - start
+    _set_stage("ready", ready=True, seconds=elapsed)
+    metrics.set_gauge("esl_ready", 1)
+    return True
+
+
+def start_background_warm_up(sentences_file=None, prerender=True):
+    """Run warm_up on a daemon thread once per process, with sentences from sentences_file if given."""
+    global _started
+    with _state_lock:
+        if _started:
+            return
+        _started = True
+
+    def run():
+        warm_up(prerender=prerender, sentences_file=sentences_file)
+
+    threading.Thread(target=run, name="esl-warmup", daemon=True).start()
+
+
+def read_sentence_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", help="File of frequent sentences, one per line (default: the app's examples)")
+    parser.add_argument("--no-prerender", action="store_true")
+    args = parser.parse_args()
+
+    ok = warm_up(prerender=not args.no_prerender, sentences_file=args.sentences)
+    print(f"Warm-up {'finished' if ok else 'failed'}: {status()}")
+    raise SystemExit(0 if ok else 1)